@@ -0,0 +1,133 @@
+"""
+bench_maze
+~~~~~~~~~~
+
+Benchmark how long :class:`imggen.Maze` takes to build the path
+through a maze, and compare it to the step by step version of the
+path builder used before paths were built from flat indices.
+"""
+from argparse import ArgumentParser
+from operator import itemgetter
+from time import perf_counter
+from typing import Sequence
+
+import numpy as np
+
+import imggen as ig
+from imggen.maze import MazePath
+
+
+# Constants.
+X, Y, Z = 2, 1, 0
+
+
+# The old path builder.
+def build_path_legacy(
+    maze: ig.Maze,
+    values: np.ndarray,
+    unit_dim: Sequence[int]
+) -> MazePath:
+    """Create the steps in the path one numpy array at a time. This
+    is the path builder :class:`imggen.Maze` used before it was
+    rewritten to use flat indices.
+    """
+    cursor = maze._calc_origin(maze.origin, unit_dim)
+    been_there = np.zeros(unit_dim, bool)
+    been_there[tuple(cursor)] = True
+    vertices = np.array([
+        (0, 0, -1),
+        (0, 0, 1),
+        (0, -1, 0),
+        (0, 1, 0),
+    ])
+    index = 0
+    path = []
+    while True:
+        acursor = np.array(cursor)
+        options = [vertex + acursor for vertex in vertices]
+        viable = [
+            (o, values[tuple(o)]) for o in options
+            if (
+                np.min(o) >= 0
+                and all(unit_dim > o)
+                and not been_there[tuple(o)]
+            )
+        ]
+        if viable:
+            cursor = tuple(acursor)
+            viable = sorted(viable, key=itemgetter(1))
+            newloc = tuple(viable[0][0])
+            path.append((cursor, newloc))
+            been_there[newloc] = True
+            cursor = newloc
+            index = len(path)
+        else:
+            index -= 1
+            if index < 0:
+                break
+            cursor = path[index][0]
+    return path
+
+
+# Benchmark.
+def bench(cells: int, seed: str, legacy: bool = True) -> None:
+    """Time building the path of a maze with the given number of
+    cells along the X and Y axes.
+    """
+    # The table of values has to be at least as long as the sides of
+    # the maze, so bigger mazes need more repeats.
+    maze = ig.Maze(
+        unit=(1, 1, 1),
+        inset=(0, 0, 0),
+        repeats=cells // 0xff + 1,
+        seed=seed
+    )
+    values, unit_dim = maze._build_grid((1, cells, cells), (0, 0, 0))
+
+    start = perf_counter()
+    topology = maze._build_path(values, unit_dim)
+    current = perf_counter() - start
+    path = topology.steps()
+    print(f'{cells}x{cells} cells, {len(path)} steps')
+    print(f'    flat indices: {current:.3f}s')
+
+    if legacy:
+        start = perf_counter()
+        old_path = build_path_legacy(maze, values, unit_dim)
+        old = perf_counter() - start
+        print(f'    legacy:       {old:.3f}s')
+        print(f'    speedup:      {old / current:.1f}x')
+        if old_path != path:
+            print('    The paths do not match!')
+
+
+# Mainline.
+if __name__ == '__main__':
+    p = ArgumentParser(
+        description='Benchmark building the paths of mazes.',
+        prog='bench_maze'
+    )
+    p.add_argument(
+        'cells',
+        action='store',
+        default=(50, 100, 150),
+        help='The number of cells along each side of the mazes.',
+        nargs='*',
+        type=int
+    )
+    p.add_argument(
+        '--no-legacy', '-n',
+        action='store_true',
+        help='Skip timing the legacy path builder, which is very slow.'
+    )
+    p.add_argument(
+        '--seed', '-s',
+        action='store',
+        default='spam',
+        help='The seed for the mazes.',
+        type=str
+    )
+    args = p.parse_args()
+
+    for cells in args.cells:
+        bench(cells, args.seed, not args.no_legacy)
@@ -6,14 +6,18 @@ The core module for the imggen package.
 """
 from abc import ABC, abstractmethod
 from inspect import signature
-from typing import Any, Sequence
+from itertools import product
+from typing import Any, Iterator, Optional, Sequence
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 
 
 # Names available for import.
-__all__ = ['ImgAry', 'Loc', 'Size', 'Source',]
+__all__ = [
+    'ImgAry', 'Loc', 'Size', 'Source', 'is_invariant', 'open_grid',
+    'tile_slices',
+]
 
 
 # Common constants.
@@ -21,9 +25,10 @@ X, Y, Z = 2, 1, 0
 
 
 # Common types.
-ImgAry = NDArray[np.float_]
+ImgAry = NDArray[Any]
 Loc = Sequence[int]
 Size = Sequence[int]
+Tile = tuple[slice, ...]
 
 
 # Base classes.
@@ -61,17 +66,292 @@ class Serializable(ABC):
 
 
 class Source(Serializable):
-    """A source of image data."""
+    """A source of image data.
+
+    Sources where :attr:`Source.loc_consistent` is `True` return the
+    same image data for a pixel no matter the size of the fill or the
+    `loc` used to reach it. Those sources can be rendered in tiles with
+    :meth:`Source.fill_tiled` and the stitched tiles will be identical
+    to a single fill of the whole volume. Sources where it's `False`
+    can still be tiled, but the tiles will not line up.
+
+    The data type of the image data is set by :attr:`Source.dtype`.
+    Double precision floats are computed in double precision. Other
+    types are computed in single precision and converted when the
+    image data is output. Unsigned integer image data is scaled to
+    the full range of the type, so `'uint8'` gives values from 0x00
+    to 0xff.
+
+    Sources where :attr:`Source.period` isn't `None` repeat their
+    image data along each axis after the given number of pixels.
+    Those sources only need to generate one period of the image data,
+    which is then repeated to fill the volume.
+
+    Some sources generate image data that doesn't change along an
+    axis. Those axes are listed in :attr:`Source.invariant_axes`. If
+    :attr:`Source.broadcast` is `True`, those sources return a
+    read-only view that repeats the image data along those axes
+    rather than a new array the size of the volume.
+
+    Sources fill exactly the volume they are given, with one
+    exception: :class:`imggen.maze.AnimatedMaze` adds its delay and
+    linger frames to the Z axis. Its output, and any `out` array
+    given to it, is longer than the volume, and it can't be filled
+    in tiles.
+    """
+    # Whether the image data for a pixel depends only on its absolute
+    # location in the space.
+    loc_consistent: bool = False
+
+    # The data type of the image data.
+    dtype: DTypeLike = 'float64'
+
+    # Whether to return read-only views for image data that doesn't
+    # change along an axis.
+    broadcast: bool = False
+
+    # The axes the image data doesn't change along.
+    invariant_axes: tuple[int, ...] = ()
+
     @abstractmethod
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. This can be
+            a view into a larger array. If it isn't given, a new
+            array is created.
+        :return: An :class:`numpy.ndarray` with image data.
+        :rtype: numpy.ndarray
+        """
+
+    def fill_tiled(
+        self, size: Size,
+        tile: Size,
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
+    ) -> ImgAry:
+        """Fill a volume with image data by generating it in tiles.
+        Only one tile is generated at a time, so the memory needed
+        for the intermediate arrays of the fill is bounded by the
+        size of the tile rather than the size of the volume.
+
+        :param size: The size of the volume of image data to generate.
+        :param tile: The maximum size of each tile along each axis.
+        :param loc: (Optional.) How much to shift the starting point
+            for the noise generation along each axis.
+        :param out: (Optional.) An array the size of the volume to
+            put the image data in. If this isn't given, a new array
+            is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
+        if out is None:
+            out = np.zeros(size, dtype=self.dtype)
+        for slices in tile_slices(size, tile):
+            tile_size = [s.stop - s.start for s in slices]
+            tile_loc = [n + s.start for n, s in zip(loc, slices)]
+            self.fill(tile_size, tile_loc, out[slices])
+        return out
+
+    def iter_tiles(
+        self, size: Size,
+        tile: Size,
+        loc: Loc = (0, 0, 0)
+    ) -> Iterator[tuple[Tile, ImgAry]]:
+        """Generate the image data for a volume one tile at a time.
+
+        :param size: The size of the volume of image data to generate.
+        :param tile: The maximum size of each tile along each axis.
+        :param loc: (Optional.) How much to shift the starting point
+            for the noise generation along each axis.
+        :return: A generator that yields the slices that locate
+            each tile within the volume and the image data of
+            that tile.
+        :rtype: Iterator
+        """
+        for slices in tile_slices(size, tile):
+            tile_size = [s.stop - s.start for s in slices]
+            tile_loc = [n + s.start for n, s in zip(loc, slices)]
+            yield slices, self.fill(tile_size, tile_loc)
+
+    # Properties.
+    @property
+    def period(self) -> Optional[Size]:
+        """The number of pixels along each axis after which the image
+        data repeats, or `None` if it doesn't repeat.
+        """
+        return None
+
+    @property
+    def _work_dtype(self) -> np.dtype:
+        """The data type used while generating the image data."""
+        if np.dtype(self.dtype) == np.float64:
+            return np.dtype(np.float64)
+        return np.dtype(np.float32)
+
+    # Private methods.
+    def _blank(self, size: Size, out: Optional[ImgAry] = None) -> ImgAry:
+        """Get an array of zeros to build the image data in. The
+        output array is used if it has the working data type.
+        """
+        if out is not None:
+            if out.shape != tuple(size):
+                msg = f'Output array shape {out.shape} does not match {size}.'
+                raise ValueError(msg)
+            if out.dtype == self._work_dtype:
+                out.fill(0)
+                return out
+        return np.zeros(size, dtype=self._work_dtype)
+
+    def _period_size(self, size: Size) -> Size:
+        """Get the size of the part of a volume that needs to be
+        generated before it starts to repeat.
+        """
+        period = self.period
+        if period is None:
+            return tuple(size)
+        return tuple(min(n, p) for n, p in zip(size, period))
+
+    def _repeat(self, a: ImgAry, size: Size) -> ImgAry:
+        """Repeat the image data for a period to fill a volume."""
+        pad = [(0, n - m) for n, m in zip(size, a.shape)]
+        if not any(after for _, after in pad):
+            return a
+        return np.pad(a, pad, mode='wrap')
+
+    def _output(
+        self, a: ImgAry,
+        size: Size,
+        out: Optional[ImgAry] = None
+    ) -> ImgAry:
+        """Put the image data in the output array, converting it to
+        the data type of the output array. Integer output is scaled
+        so that one is the largest value the type can hold. Image
+        data that doesn't vary along an axis can have a length of one
+        on that axis, and it will be broadcast to fill the volume.
+        If :attr:`Source.broadcast` is `True` and no output array is
+        given, that is done with a read-only view.
+        """
+        if out is None:
+            dtype = np.dtype(self.dtype)
+            if a.shape == tuple(size) and a.dtype == dtype:
+                return a
+            if self.broadcast:
+                compact = a
+                if a.dtype != dtype:
+                    compact = np.empty(a.shape, dtype=dtype)
+                    self._convert(a, compact)
+                return np.broadcast_to(compact, size)
+            out = np.empty(size, dtype=dtype)
+        elif out.shape != tuple(size):
+            msg = f'Output array shape {out.shape} does not match {size}.'
+            raise ValueError(msg)
+        elif a is out:
+            return out
+        self._convert(a, out)
+        return out
+
+    def _convert(self, a: ImgAry, out: ImgAry) -> None:
+        """Put image data into an array, converting it to the data
+        type of that array.
+        """
+        if out.dtype.kind in 'ui':
+            top = np.iinfo(out.dtype).max
+            np.multiply(np.clip(a, 0, 1), top, out=out, casting='unsafe')
+        else:
+            out[...] = a
+
+
+# Utility functions.
+def is_invariant(a: ImgAry, axis: int) -> bool:
+    """Check whether image data is a view that repeats the same values
+    along an axis, like the image data returned by sources that have
+    :attr:`Source.broadcast` set.
+
+    :param a: The image data.
+    :param axis: The axis to check.
+    :return: A :class:`bool`.
+    :rtype: bool
+
+    Usage::
+
+        >>> a = np.broadcast_to(np.array([[[0.0, 1.0]]]), (3, 2, 2))
+        >>> is_invariant(a, 0)
+        True
+        >>> is_invariant(a, 2)
+        False
+    """
+    return a.shape[axis] == 1 or a.strides[axis] == 0
+
+
+def open_grid(
+    size: Size,
+    loc: Optional[Loc] = None,
+    dtype: DTypeLike = 'float64'
+) -> list[ImgAry]:
+    """Get the location of each pixel in a volume along each axis.
+    Each array has a length of one on every axis but its own, so the
+    arrays broadcast against each other like :data:`numpy.ogrid`
+    without building the coordinates for the whole volume.
+
+    :param size: The size of the volume.
+    :param loc: (Optional.) How much to shift the locations along
+        each axis.
+    :param dtype: (Optional.) The data type of the locations.
+    :return: A :class:`list` with an array for each axis.
+    :rtype: list
+
+    Usage::
+
+        >>> z, y, x = open_grid((1, 2, 3), (0, 5, 0), dtype=int)
+        >>> y
+        array([[[5],
+                [6]]])
+        >>> x
+        array([[[0, 1, 2]]])
+    """
+    grid = []
+    for axis, length in enumerate(size):
+        coords = np.arange(length, dtype=dtype)
+        if loc is not None:
+            coords += loc[axis]
+        shape = [1] * len(size)
+        shape[axis] = length
+        grid.append(coords.reshape(shape))
+    return grid
+
+
+def tile_slices(size: Size, tile: Size) -> Iterator[Tile]:
+    """Split a volume into tiles.
+
+    :param size: The size of the volume.
+    :param tile: The maximum size of each tile along each axis.
+    :return: A generator that yields the slices for each tile.
+    :rtype: Iterator
+
+    Usage::
+
+        >>> for slices in tile_slices((1, 3, 2), (1, 2, 2)):
+        ...     print(slices)
+        (slice(0, 1, None), slice(0, 2, None), slice(0, 2, None))
+        (slice(0, 1, None), slice(2, 3, None), slice(0, 2, None))
+    """
+    if len(size) != len(tile):
+        msg = 'Tile must have the same number of dimensions as the size.'
+        raise ValueError(msg)
+    if any(n < 1 for n in tile):
+        raise ValueError('Tile must be at least one pixel on each axis.')
+    axes = [
+        [slice(i, min(i + t, s)) for i in range(0, s, t)]
+        for s, t in zip(size, tile)
+    ]
+    for slices in product(*axes):
+        yield slices
@@ -4,17 +4,17 @@ noise
 
 Image data sources that contain a random element.
 """
-from typing import Sequence, Union
+from typing import Literal, Optional, Sequence, Union
 
-import cv2
 import numpy as np
-from numpy.random import default_rng
-from numpy.typing import NDArray
+from numpy.random import SeedSequence, default_rng
+from numpy.typing import DTypeLike, NDArray
 
 from imggen.imggen import ImgAry, Loc, Size, Source, X, Y, Z
 
 
 # Common types.
+Mode = Literal['stream', 'counter']
 Seed = Union[None, int, str, bytes]
 
 
@@ -37,20 +37,58 @@ class Noise(Source):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
+    :param mode: (Optional.) How the random numbers are generated.
+        In "stream" mode, they are drawn from a random number
+        generator, so each fill continues from where the last one
+        left off. In "counter" mode, each number is a hash of the
+        seed and its location, so any part of the space can be
+        generated on its own, and the same part of the space always
+        gets the same values.
     :return: :class:Noise object.
     :rtype: imggen.noise.Noise
+
+    Generating noise at a location in "stream" mode requires creating
+    all the noise between the origin and that location, so large
+    values of `loc` are slow and use a lot of memory. "Counter" mode
+    only creates the noise in the filled volume, and tiles of it line
+    up with each other.
     """
-    def __init__(self, seed: Seed = None) -> None:
+    def __init__(
+        self, seed: Seed = None,
+        dtype: DTypeLike = 'float64',
+        mode: Mode = 'stream'
+    ) -> None:
         """Initialize an instance of Noise."""
         # Store the seed for potential serialization.
         self.seed = seed
+        self.dtype = dtype
+
+        if mode not in ('stream', 'counter'):
+            msg = f'{mode} is not a valid value for mode.'
+            raise ValueError(msg)
+        self.mode = mode
 
         # This seeds the random number generator. The code here is
         # maybe a bit opaque. Think about changing it in the future.
         self._rng = self._get_rng(seed)
+        self._key = self._get_key(seed)
 
     # Properties.
+    @property
+    def loc_consistent(self) -> bool:
+        """Whether tiles of this source line up with each other."""
+        return self.mode == 'counter'
+
+    def _get_key(self, seed: Seed) -> np.uint64:
+        """Get the key for the hash used in "counter" mode."""
+        seq = SeedSequence(self._seed_to_int(seed))
+        return seq.generate_state(1, np.uint64)[0]
+
     def _get_rng(self, seed: Seed) -> np.random._generator.Generator:
+        return default_rng(self._seed_to_int(seed))
+
+    def _seed_to_int(self, seed: Seed) -> Optional[int]:
         # The seed value for numpy.default_rng cannot be a string.
         # You can't convert directly from string to integer, so
         # convert the string to bytes.
@@ -60,21 +98,29 @@ class Noise(Source):
         # The seed value for numpy.default_rng needs to be an integer.
         if isinstance(seed, bytes):
             seed = int.from_bytes(seed, 'little')
-        return default_rng(seed)
+        return seed
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
+        if self.mode == 'counter':
+            a = self._counter_random(size, loc)
+            return self._output(a, size, out)
+
         # Random number generation is linear and unidirectional. In
         # order to give the illusion of their being a space to move
         # in, we define the location of the first number generated
@@ -83,6 +129,22 @@ class Noise(Source):
         # the positive spaces.
         new_loc = [abs(n) for n in loc]
 
+        # Make sure the output array fits before anything is written
+        # to it.
+        if out is not None and out.shape != tuple(size):
+            msg = f'Output array shape {out.shape} does not match {size}.'
+            raise ValueError(msg)
+
+        # If there is no offset, the generator can write straight into
+        # the output array.
+        if (
+            not any(new_loc)
+            and out is not None
+            and out.dtype == np.float64
+            and out.flags.c_contiguous
+        ):
+            return self._rng.random(out.shape, out=out)
+
         # To simulate positioning within a space, we need to burn
         # random numbers from the generator. This would be easy if
         # we were just generating single dimensional noise. Then
@@ -95,7 +157,50 @@ class Noise(Source):
         a = self._rng.random(new_size)
         slices = tuple(slice(n, None) for n in new_loc)
         a = a[slices]
-        return a
+        return self._output(a, size, out)
+
+    # Private methods.
+    def _counter_hash(
+        self, size: Size,
+        loc: Loc,
+        stream: int = 0
+    ) -> NDArray[np.uint64]:
+        """Hash the key, the stream, and the location of each value."""
+        # The hash is built one axis at a time, so the intermediate
+        # values only need to be as big as the axes hashed so far.
+        h = np.full((1,) * len(size), self._key, dtype=np.uint64)
+        h = self._mix(h + np.uint64(stream))
+        for axis, (length, start) in enumerate(zip(size, loc)):
+            coords = np.arange(start, start + length, dtype=np.int64)
+            shape = [1] * len(size)
+            shape[axis] = length
+            h = self._mix(h + coords.astype(np.uint64).reshape(shape))
+        return h
+
+    def _counter_random(
+        self, size: Size,
+        loc: Loc,
+        stream: int = 0
+    ) -> NDArray[np.float64]:
+        """Generate random numbers from a hash of the key, the stream,
+        and the location of each number.
+        """
+        # Use the top 53 bits of the hash to fill the mantissa of
+        # a float in the interval [0, 1).
+        h = self._counter_hash(size, loc, stream)
+        h >>= np.uint64(11)
+        return h.astype(np.float64) * 2.0 ** -53
+
+    def _mix(self, h: NDArray[np.uint64]) -> NDArray[np.uint64]:
+        """Scramble the bits of an array of integers using the
+        finalizer from SplitMix64.
+        """
+        h ^= h >> np.uint64(30)
+        h *= np.uint64(0xbf58476d1ce4e5b9)
+        h ^= h >> np.uint64(27)
+        h *= np.uint64(0x94d049bb133111eb)
+        h ^= h >> np.uint64(31)
+        return h
 
 
 class Embers(Noise):
@@ -123,68 +228,172 @@ class Embers(Noise):
         integers for seeding.
     :param ease: (Optional.) The easing function to use on the
         generated noise.
+    :param dtype: (Optional.) The data type of the image data.
+    :param mode: (Optional.) How the random numbers are generated.
+        See :class:`Noise` for details. Tiles only line up exactly
+        in "counter" mode when depth is one. The larger dots in the
+        other layers are scaled up from the location of each tile,
+        so they don't match across the edges between tiles.
+    :param sparse: (Optional.) In "stream" mode, draw the number of
+        points that pass the threshold and their locations directly
+        rather than generating a random value for every pixel. The
+        image data isn't the same as when this is `False`, but it
+        has the same distribution. It is much faster when the
+        threshold is high. It has no effect in "counter" mode, since
+        every location has to be hashed to find the points there.
     :return: :class:`Embers` object.
     :rtype: imggen.noise.Embers
     """
     def __init__(
         self, depth: int = 1,
         threshhold: float = 0.9998,
-        *args, **kwargs
+        *args,
+        sparse: bool = False,
+        **kwargs
     ) -> None:
         super().__init__(*args, **kwargs)
         self.depth = depth
         self.threshhold = threshhold
+        self.sparse = sparse
+
+    # Properties.
+    @property
+    def loc_consistent(self) -> bool:
+        """Whether tiles of this source line up with each other. The
+        magnified layers are scaled from the location of the tile, so
+        only a single layer lines up.
+        """
+        return self.mode == 'counter' and self.depth == 1
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
         mag = 1.0
-        out = np.zeros(size, dtype=float)
+        a = self._blank(size, out)
         for layer in range(self.depth):
             # Use the magnification to determine the size of the noise
             # to get.
             fill_size = [size[0], *(int(n // mag) for n in size[1:])]
 
-            # Get the noise to work with.
-            a = super().fill(fill_size, loc)
-
-            # Use the threshold to turn it into a sparse collection
-            # of points. Then scale to increase the apparent difference
-            # in brightness.
-            a = a - self.threshhold
-            a[a < 0] = 0.0
-            a[a > 0] = a[a > 0] * 0.25
-            a[a > 0] = a[a > 0] + 0.75
+            # Get the points for the layer.
+            if self.sparse and self.mode == 'stream':
+                points = self._sparse_points(fill_size, loc)
+            else:
+                points = self._dense_points(fill_size, loc, layer)
 
             # Resize to increase the size of the points.
-            resized = np.zeros(size, dtype=a.dtype)
-            for i in range(resized.shape[Z]):
-                frame = np.zeros(a.shape[Y:3], dtype=a.dtype)
-                frame = a[i]
-                resized[i] = cv2.resize(frame, (size[X], size[Y]))
+            resized = self._upscale(points, size)
 
             # Blend the layer with previous layers.
-            out = self._blend(out, resized)
+            self._blend(a, resized)
 
             mag = mag * 1.5
 
-        return out
+        return self._output(a, size, out)
 
     # Private methods.
     def _blend(self, a: ImgAry, b: ImgAry) -> ImgAry:
-        ab = a.copy()
-        ab[b > a] = b[b > a]
-        return ab
+        """Keep the brighter of the two values in the first array."""
+        return np.maximum(a, b, out=a)
+
+    def _dense_points(self, size: Size, loc: Loc, layer: int) -> ImgAry:
+        """Generate noise for every pixel and keep the values that
+        pass the threshold as points.
+        """
+        # Get the noise to work with. In "counter" mode, each
+        # layer hashes a different stream, so the layers differ.
+        if self.mode == 'counter':
+            points = self._counter_random(size, loc, layer)
+            points = points.astype(self._work_dtype, copy=False)
+        else:
+            points = np.empty(size, dtype=self._work_dtype)
+            points = super().fill(size, loc, points)
+
+        # Use the threshold to turn it into a sparse collection
+        # of points. Then scale to increase the apparent difference
+        # in brightness.
+        points = points - self.threshhold
+        points[points < 0] = 0.0
+        points[points > 0] = points[points > 0] * 0.25
+        points[points > 0] = points[points > 0] + 0.75
+        return points
+
+    def _sparse_points(self, size: Size, loc: Loc) -> ImgAry:
+        """Draw the points that pass the threshold without generating
+        noise for every pixel.
+        """
+        # Like Noise.fill, the offset is simulated by generating the
+        # points for the space between the origin and the location,
+        # then throwing those points away.
+        new_loc = [abs(n) for n in loc]
+        new_size = [s + l for s, l in zip(size, new_loc)]
+        total = int(np.prod(new_size))
+
+        # Each pixel passes the threshold independently, so the number
+        # of points is binomially distributed. The values that pass
+        # are uniformly distributed between the threshold and one.
+        low = min(max(self.threshhold, 0.0), 1.0)
+        count = self._rng.binomial(total, 1.0 - low)
+        flat = self._rng.choice(total, count, replace=False, shuffle=False)
+        values = self._rng.uniform(low, 1.0, count)
+
+        # Splat the points that are in the filled volume.
+        coords = np.unravel_index(flat, new_size)
+        keep = np.ones(count, dtype=bool)
+        for axis_coords, offset in zip(coords, new_loc):
+            keep &= axis_coords >= offset
+        index = tuple(c[keep] - l for c, l in zip(coords, new_loc))
+        points = np.zeros(size, dtype=self._work_dtype)
+        points[index] = (values[keep] - self.threshhold) * 0.25 + 0.75
+        return points
+
+    def _upscale(self, a: ImgAry, size: Size) -> ImgAry:
+        """Resize every frame of the image data at once using bilinear
+        interpolation.
+        """
+        for axis in Y, X:
+            a = self._upscale_axis(a, size[axis], axis)
+        return a
+
+    def _upscale_axis(self, a: ImgAry, length: int, axis: int) -> ImgAry:
+        """Resize the image data along one axis."""
+        src_length = a.shape[axis]
+        if src_length == length:
+            return a
+
+        # Find the source pixels on each side of the center of each
+        # resized pixel and how close the center is to the far side.
+        # Beyond the edges of the source, the edge pixel is used.
+        centers = (np.arange(length) + 0.5) * (src_length / length) - 0.5
+        near = np.floor(centers)
+        weights = (centers - near).astype(a.dtype)
+        near = near.astype(np.intp)
+        edges = (near < 0) | (near >= src_length - 1)
+        weights[edges] = 0
+        near = np.clip(near, 0, src_length - 1)
+        far = np.minimum(near + 1, src_length - 1)
+
+        shape = [1] * a.ndim
+        shape[axis] = length
+        weights = weights.reshape(shape)
+        result = np.take(a, near, axis)
+        result *= 1 - weights
+        result += np.take(a, far, axis) * weights
+        return result
 
 
 if __name__ == '__main__':
@@ -4,13 +4,15 @@ patterns
 
 mage data sources for the imggen module that create non-random patterns.
 """
+from functools import lru_cache
 from math import sqrt
-from typing import Literal, Optional, Sequence
+from typing import Literal, NamedTuple, Optional, Sequence, Union
 
 import numpy as np
+from numpy.typing import DTypeLike, NDArray
 from PIL import Image, ImageDraw, ImageFont
 
-from imggen.imggen import ImgAry, Loc, Size, Source, X, Y, Z
+from imggen.imggen import ImgAry, Loc, Size, Source, X, Y, Z, open_grid
 
 
 # Names available for import.
@@ -20,6 +22,278 @@ __all__ = [
 ]
 
 
+# Common types.
+FontKey = tuple[str, int, int, str, Optional[ImageFont.Layout]]
+
+
+# The number of fields kept by each of the coordinate field caches.
+FIELD_CACHE_SIZE = 8
+
+
+# Coordinate fields.
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def angle_field(
+    shape: tuple[int, int],
+    center: tuple[float, float],
+    dtype: DTypeLike = 'float64'
+) -> ImgAry:
+    """Get the angle of each pixel in a frame from a center point,
+    measured in radians from zero to two pi. The fields are cached,
+    so sources that share a center share the field. Use
+    `angle_field.cache_info()` to see how well the cache is working.
+
+    :param shape: The size of the frame along the Y and X axes.
+    :param center: The location of the center along the Y and X axes.
+    :param dtype: (Optional.) The data type of the field.
+    :return: A read-only :class:`numpy.ndarray`.
+    :rtype: numpy.ndarray
+    """
+    y, x = open_grid(shape, dtype=dtype)
+    y -= center[0]
+    x -= center[1]
+    a = np.arctan2(y, x)
+    a[a < 0] += 2 * np.pi
+
+    # Pixels directly below the center have always been at an angle
+    # of zero, and pixels directly above it at two pi.
+    a[(x == 0) & (y >= 0)] = 0
+    a[(x == 0) & (y < 0)] = 2 * np.pi
+    a.flags.writeable = False
+    return a
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def radius_field(
+    shape: tuple[int, int],
+    center: tuple[float, float],
+    dtype: DTypeLike = 'float64'
+) -> ImgAry:
+    """Get the distance of each pixel in a frame from a center point.
+    The fields are cached, so sources that share a center share the
+    field. Use `radius_field.cache_info()` to see how well the cache
+    is working.
+
+    :param shape: The size of the frame along the Y and X axes.
+    :param center: The location of the center along the Y and X axes.
+    :param dtype: (Optional.) The data type of the field.
+    :return: A read-only :class:`numpy.ndarray`.
+    :rtype: numpy.ndarray
+    """
+    y, x = open_grid(shape, dtype=dtype)
+    y -= center[0]
+    x -= center[1]
+    a = np.sqrt(x ** 2 + y ** 2)
+    a.flags.writeable = False
+    return a
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def gradient_lut(
+    stops: tuple[tuple[float, float], ...],
+    length: int
+) -> ImgAry:
+    """Get the colors of a gradient along an axis. The colors are
+    cached, so gradients with the same stops and length share them.
+    Use `gradient_lut.cache_info()` to see how well the cache is
+    working.
+
+    :param stops: The position and color of each stop of the gradient.
+    :param length: The length of the axis.
+    :return: A read-only :class:`numpy.ndarray`.
+    :rtype: numpy.ndarray
+    """
+    a_index = np.arange(length) / (length - 1)
+    positions = np.array(stops, dtype=float)
+    lefts, rights = positions[:-1], positions[1:]
+
+    # When the stops overlap, the color comes from the last pair of
+    # stops that a pixel is between. Pixels that aren't between any
+    # pair of stops keep their position as their color.
+    between = (a_index >= lefts[:, :1]) & (a_index <= rights[:, :1])
+    last = len(between) - 1 - np.argmax(between[::-1], axis=0)
+    left, right = lefts[last].T, rights[last].T
+
+    # Interpolate the color of each pixel based on its distance from
+    # each of the stops and the color of those stops.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a = (a_index - left[0]) / (right[0] - left[0])
+    a = a * right[1] + (1 - a) * left[1]
+    a = np.where(np.any(between, axis=0), a, a_index)
+    a.flags.writeable = False
+    return a
+
+
+# Text caches.
+@lru_cache(maxsize=32)
+def _load_font(
+    font: str,
+    size: int,
+    face: int,
+    encoding: str,
+    layout_engine: Optional[ImageFont.Layout]
+) -> ImageFont.FreeTypeFont:
+    """Load a font. Fonts are cached, so each font is only loaded
+    once no matter how many :class:`Text` objects use it.
+    """
+    return ImageFont.truetype(font, size, face, encoding, layout_engine)
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _draw_text(
+    canvas: tuple[int, int],
+    font: FontKey,
+    text: str,
+    origin: tuple[float, float],
+    fill_color: int,
+    bg_color: int,
+    spacing: float,
+    align: str,
+    stroke_width: int,
+    stroke_fill: int
+) -> ImgAry:
+    """Draw text on a frame. Frames are cached, so text that appears
+    in many frames is only drawn and converted once.
+
+    :return: A read-only :class:`numpy.ndarray` with the image data
+        of the frame.
+    :rtype: numpy.ndarray
+    """
+    img = Image.new('L', canvas, bg_color)
+    draw = ImageDraw.Draw(img)
+    draw.text(
+        xy=origin,
+        text=text,
+        fill=fill_color,
+        font=_load_font(*font),
+        anchor=None,
+        spacing=spacing,
+        align=align,
+        stroke_width=stroke_width,
+        stroke_fill=stroke_fill
+    )
+    a = np.array(img).astype(float) / 0xff
+    a.flags.writeable = False
+    return a
+
+
+class GlyphAtlas(NamedTuple):
+    """The glyphs of a font rasterized into one array.
+
+    :param glyphs: The coverage of each glyph, from 0 to 1. Each glyph
+        is drawn in a cell of the same size with its origin `bearing`
+        pixels from the left edge of the cell and its ascender at the
+        top of the cell.
+    :param advances: How far each glyph moves the next glyph.
+    :param index: The position of each character in the atlas.
+    :param bearing: How far the origin of each glyph is from the left
+        edge of its cell.
+    :param line_height: The height of a line of text, not counting
+        the spacing between lines.
+    """
+    glyphs: ImgAry
+    advances: NDArray[np.float64]
+    index: dict[str, int]
+    bearing: int
+    line_height: float
+
+
+@lru_cache(maxsize=32)
+def glyph_atlas(font: FontKey, chars: str) -> GlyphAtlas:
+    """Rasterize the glyphs for the given characters of a font. Atlases
+    are cached, so each glyph is only drawn once no matter how many
+    frames it is used in.
+
+    :param font: The values that identify the font.
+    :param chars: The characters to rasterize.
+    :return: A :class:`GlyphAtlas` object.
+    :rtype: imggen.patterns.GlyphAtlas
+    """
+    typeface = _load_font(*font)
+    boxes = [typeface.getbbox(char) for char in chars]
+    bearing = max([0, *(-box[0] for box in boxes)])
+    width = max([1, *(bearing + box[2] for box in boxes)])
+    height = max([1, *(box[3] for box in boxes)])
+
+    glyphs = np.zeros((len(chars), height, width), dtype=float)
+    for i, char in enumerate(chars):
+        img = Image.new('L', (width, height), 0)
+        draw = ImageDraw.Draw(img)
+        draw.text((bearing, 0), char, fill=0xff, font=typeface)
+        glyphs[i] = np.array(img) / 0xff
+    glyphs.flags.writeable = False
+
+    advances = np.array([typeface.getlength(char) for char in chars])
+    advances.flags.writeable = False
+    return GlyphAtlas(
+        glyphs=glyphs,
+        advances=advances,
+        index={char: i for i, char in enumerate(chars)},
+        bearing=bearing,
+        line_height=typeface.getbbox('A')[3]
+    )
+
+
+def _layout_text(
+    atlas: GlyphAtlas,
+    text: str,
+    origin: tuple[float, float],
+    spacing: float,
+    align: str
+) -> list[tuple[int, int, int]]:
+    """Place the glyphs of text. Lines are spaced, aligned, and
+    snapped to pixels the same way :meth:`PIL.ImageDraw.ImageDraw.text`
+    does it, but the glyphs are placed by their advances without
+    kerning. Lines that start above the top of the image can land a
+    pixel away from where Pillow draws them.
+
+    :return: The index, top, and left of the cell of each glyph.
+    :rtype: list
+    """
+    lines = text.split('\n')
+    widths = [
+        sum(atlas.advances[atlas.index[char]] for char in line)
+        for line in lines
+    ]
+    max_width = max(widths)
+    left, top = origin
+    placed = []
+    for line, width in zip(lines, widths):
+        pen = left
+        if align == 'center':
+            pen += (max_width - width) / 2
+        elif align == 'right':
+            pen += max_width - width
+
+        # Pillow renders at fractional positions, which snaps glyphs
+        # to the nearest pixel. Halves round right along the X axis
+        # but up along the Y axis, since FreeType's Y axis points up.
+        y = int(np.ceil(top - .5))
+        for char in line:
+            glyph = atlas.index[char]
+            x = int(np.floor(pen + .5)) - atlas.bearing
+            placed.append((glyph, y, x))
+            pen += atlas.advances[glyph]
+        top += atlas.line_height + spacing
+    return placed
+
+
+def _paste_glyph(a: ImgAry, glyph: ImgAry, top: int, left: int) -> None:
+    """Add a glyph to a frame, clipping any part of it that falls
+    outside of the frame.
+    """
+    height, width = glyph.shape
+    y0, x0 = max(top, 0), max(left, 0)
+    y1 = min(top + height, a.shape[0])
+    x1 = min(left + width, a.shape[1])
+    if y0 < y1 and x0 < x1:
+        region = a[y0:y1, x0:x1]
+        np.maximum(
+            region,
+            glyph[y0 - top:y1 - top, x0 - left:x1 - left],
+            out=region
+        )
+
+
 # Public classes.
 class Box(Source):
     """Draw a box.
@@ -33,37 +307,44 @@ class Box(Source):
     :param dimensions: The size of the box in three dimensions.
     :param color: The color of the box. This is a float within the
         range 0 <= x <= 1.
+    :param dtype: (Optional.) The data type of the image data.
     :return: A :class:`Box` object.
     :rtype: imggen.patterns.Box
     """
     def __init__(
         self, origin: Loc,
         dimensions: Sequence[int],
-        color: float = 1.0
+        color: float = 1.0,
+        dtype: DTypeLike = 'float64'
     ) -> None:
         self.origin = origin
         self.dimensions = dimensions
         self.color = color
+        self.dtype = dtype
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        a = np.zeros(size)
+        a = self._blank(size, out)
         start = [n + o for n, o in zip(loc, self.origin)]
         end = [s + d for s, d in zip(start, self.dimensions)]
         slices = [slice(s, e) for s, e in zip(start, end)]
         a[tuple(slices)] = self.color
-        return a
+        return self._output(a, size, out)
 
 
 class Gradient(Source):
@@ -82,14 +363,23 @@ class Gradient(Source):
         of numbers. It's parsed in pairs, with the first number being
         the position of the stop and the second being the color value
         of the stop.
+    :param dtype: (Optional.) The data type of the image data.
+    :param broadcast: (Optional.) Whether to return a read-only view
+        that repeats the image data along the axes it doesn't change
+        along rather than a new array. See
+        :class:`imggen.imggen.Source` for details.
     :return: :class:`Gradient` object.
     :rtype: imggen.patterns.Gradient
     """
     def __init__(
         self, direction: str = 'h',
-        stops: Sequence[float] = (0, 0, 1, 1)
+        stops: Sequence[float] = (0, 0, 1, 1),
+        dtype: DTypeLike = 'float64',
+        broadcast: bool = False
     ) -> None:
         self.direction = direction
+        self.dtype = dtype
+        self.broadcast = broadcast
 
         # Parse the stops for the gradient.
         if isinstance(stops, str):
@@ -115,16 +405,32 @@ class Gradient(Source):
         if self.stops[-1][0] != 1:
             self.stops.append([1, self.stops[-1][1]])
 
+    # Properties.
+    @property
+    def invariant_axes(self) -> tuple[int, ...]:
+        """The axes the image data doesn't change along."""
+        if self.direction == 'h':
+            return (Z, Y)
+        elif self.direction == 'v':
+            return (Z, X)
+        elif self.direction == 't':
+            return (Y, X)
+        return ()
+
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
@@ -135,50 +441,19 @@ class Gradient(Source):
             a_size = size[Y]
         elif self.direction == 't':
             a_size = size[Z]
-        a = np.indices((a_size,))[0] / (a_size - 1)
-        a_rev = 1 - a.copy()
-        a_index = a.copy()
-
-        # Interpolate the color values between the stops.
-        # To do this I need to know the percentage of distance each
-        # pixel represents. So, I need to do this in pairs.
-        left_stop = self.stops[0]
-        for right_stop in self.stops[1:]:
-
-            # Create an array mask that isolates the area between the
-            # two stops.
-            mask = np.zeros(a.shape, bool)
-            mask[a_index >= left_stop[0]] = True
-            mask[a_index > right_stop[0]] = False
-
-            # Determine where each pixel is within the area between
-            # the two stops.
-            distance = right_stop[0] - left_stop[0]
-            a[mask] = a_index[mask] - left_stop[0]
-            a[mask] = a[mask] / distance
-            a_rev[mask] = 1 - a[mask]
-
-            # Interpolate the color of the pixel based on its distance
-            # from each of those stops and the color of those stops.
-            a[mask] = a[mask] * right_stop[1]
-            a_rev[mask] = a_rev[mask] * left_stop[1]
-            a[mask] = a[mask] + a_rev[mask]
-
-            # The right stop for this part of the gradient is the left
-            # stop for the next part of the gradient.
-            left_stop = right_stop
+        stops = tuple(tuple(stop) for stop in self.stops)
+        a = gradient_lut(stops, a_size)
+        if not self.broadcast:
+            a = a.copy()
 
         # Run the easing function on the values and return the result.
         if self.direction == 'h':
             a = a.reshape(1, 1, a_size)
-            a = np.tile(a, (size[Z], size[Y], 1))
         elif self.direction == 'v':
             a = a.reshape(1, a_size, 1)
-            a = np.tile(a, (size[Z], 1, size[X]))
         elif self.direction == 't':
             a = a.reshape(a_size, 1, 1)
-            a = np.tile(a, (1, size[Y], size[X]))
-        return a
+        return self._output(a, size, out)
 
 
 class Hexes(Source):
@@ -200,65 +475,123 @@ class Hexes(Source):
     :param round: (Optional.) Whether to apply a circular easing
         function to output to give the appearance of the exterior
         of a sphere.
+    :param dtype: (Optional.) The data type of the image data.
+    :param broadcast: (Optional.) Whether to return a read-only view
+        that repeats the image data along the axes it doesn't change
+        along rather than a new array. See
+        :class:`imggen.imggen.Source` for details.
     :return: A :class:`imggen.Hexes` object.
     :rtype: imggen.patterns.Hexes
     """
+    # The hexagons are the same in every frame.
+    invariant_axes = (Z,)
+
     def __init__(
         self, radius: int,
         cells: bool = True,
-        round: bool = False
+        round: bool = False,
+        dtype: DTypeLike = 'float64',
+        broadcast: bool = False
     ) -> None:
         self.cells = cells
         self.radius = radius
         self.round = round
+        self.dtype = dtype
+        self.broadcast = broadcast
     
     # Public methods.
     def fill(
         self, size: Sequence[int],
-        loc: Sequence[int] = (0, 0, 0)
+        loc: Sequence[int] = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        # Place the centers of the hexagons.
-        seeds = []
-        x, y, row = 0.0, 0.0, 0.0
-        xstep: float = self.radius
-        ystep: float = sqrt(xstep ** 2 - (xstep / 2) ** 2)
-        while y <= size[Y] + ystep:
-            while x <= size[X] + xstep:
-                seeds.append((y, x))
-                x += xstep
-            y += ystep
-            row += 1
-            x = 0
-            if row % 2:
-                x += xstep / 2
-        
-        # Map the distances to the points.
-        indices = np.indices(size[1:])
+        # The centers of the hexagons are a lattice, so the nearest
+        # center to a pixel is in one of the two rows of centers above
+        # and below it, and it's one of the two centers to the left
+        # and right of it in that row. Since the square root doesn't
+        # change which center is nearest, it's taken at the end.
+        rows, columns = self._place_centers(size)
+        row_index, row_dist = self._bracket(rows, size[Y])
+        column_dist = np.stack([
+            np.min(self._bracket(c, size[X])[1], axis=0)
+            for c in columns
+        ])
+        dist = np.full(size[1:], np.inf, dtype=self._work_dtype)
+        for index, axis_dist in zip(row_index, row_dist):
+            work = column_dist[index % 2]
+            work += axis_dist.reshape(-1, 1)
+            np.minimum(dist, work, out=dist)
         max_dist = np.sqrt(sum(n ** 2 for n in size))
-        dist = np.zeros(size[1:], dtype=float)
-        dist.fill(max_dist)
-        for seed in seeds:
-            axis_dist = [p - i for p, i in zip(seed, indices)]
-            work = np.sqrt(sum(d ** 2 for d in axis_dist))
-            dist[work < dist] = work[work < dist]
+        np.sqrt(dist, out=dist)
+        np.minimum(dist, dist.dtype.type(max_dist), out=dist)
         act_max_dist = np.max(dist)
         a = dist / act_max_dist
-        a = np.tile(a, (size[Z], 1, 1))
         if not self.cells:
             a[a > self.radius] = self.radius
         if self.round:
             a = np.sqrt(1 - a ** 2)
         else:
             a = 1 - a
-        return a
+        return self._output(a[np.newaxis, ...], size, out)
+
+    # Private methods.
+    def _bracket(
+        self, centers: Sequence[float],
+        length: int
+    ) -> tuple[NDArray[np.intp], ImgAry]:
+        """Find the centers on either side of each pixel along an axis.
+
+        :param centers: The locations of the centers along the axis.
+        :param length: The length of the axis.
+        :return: The indices of the centers before and after each
+            pixel, and the squares of the distances to them.
+        :rtype: tuple
+        """
+        points = np.array(centers, dtype=self._work_dtype)
+        coords = np.arange(length, dtype=self._work_dtype)
+        before = np.searchsorted(points, coords, side='right') - 1
+        before = np.clip(before, 0, len(points) - 1)
+        after = np.minimum(before + 1, len(points) - 1)
+        indices = np.stack((before, after))
+        return indices, (points[indices] - coords) ** 2
+
+    def _place_centers(
+        self, size: Sequence[int]
+    ) -> tuple[list[float], tuple[list[float], list[float]]]:
+        """Place the centers of the hexagons.
+
+        :param size: The size of the volume of image data to generate.
+        :return: The Y locations of the rows of centers, and the X
+            locations of the centers in the even and odd rows.
+        :rtype: tuple
+        """
+        xstep: float = self.radius
+        ystep: float = sqrt(xstep ** 2 - (xstep / 2) ** 2)
+        rows = []
+        y = 0.0
+        while y <= size[Y] + ystep:
+            rows.append(y)
+            y += ystep
+
+        columns = []
+        for x in 0.0, xstep / 2:
+            row = []
+            while x <= size[X] + xstep:
+                row.append(x)
+                x += xstep
+            columns.append(row)
+        return rows, (columns[0], columns[1])
 
 
 class Lines(Source):
@@ -273,32 +606,58 @@ class Lines(Source):
     :param direction: (Optional.) This should be 'h' for a horizontal
         gradient or 'v' for a vertical gradient.
     :param length: (Optional.) The distance between each line.
+    :param dtype: (Optional.) The data type of the image data.
     :return: :class:`Lines` object.
     :rtype: imggen.patterns.Lines
     """
+    # Tiles of this source line up with each other.
+    loc_consistent = True
+
     def __init__(
         self, direction: str = 'h',
-        length: float = 64
+        length: float = 64,
+        dtype: DTypeLike = 'float64'
     ) -> None:
         self.direction = direction
         self.length = float(length)
+        self.dtype = dtype
+
+    # Properties.
+    @property
+    def period(self) -> Optional[Size]:
+        """The number of pixels along each axis after which the image
+        data repeats. The lines only repeat exactly when the distance
+        between them is a whole number of pixels.
+        """
+        length = self.length - 1
+        if length <= 0 or not length.is_integer():
+            return None
+        n = int(length)
+        if self.direction == 'v':
+            return (n, 1, n)
+        elif self.direction == 'h':
+            return (n, n, 1)
+        return (1, n, n)
 
     # Public methods.
     def fill(
         self, size: Sequence[int],
-        loc: Sequence[int] = (0, 0, 0)
+        loc: Sequence[int] = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        values = np.indices(size, dtype=float)
-        for axis in X, Y, Z:
-            values[axis] += loc[axis]
+        period_size = self._period_size(size)
+        values = open_grid(period_size, loc, self._work_dtype)
         if self.direction == 'v':
             values = values[X] + values[Z]
         elif self.direction == 'h':
@@ -309,7 +668,8 @@ class Lines(Source):
         values = values % period
         values[values > period / 2] = period - values[values > period / 2]
         values = (values / (period / 2))
-        return values
+        values = self._repeat(values, size)
+        return self._output(values, size, out)
 
 
 class Rays(Source):
@@ -324,26 +684,42 @@ class Rays(Source):
     :param count: The number of rays to generate.
     :param offset: (Optional.) Rotate the rays around the generation
         point. This is measured in radians.
+    :param dtype: (Optional.) The data type of the image data.
+    :param broadcast: (Optional.) Whether to return a read-only view
+        that repeats the image data along the axes it doesn't change
+        along rather than a new array. See
+        :class:`imggen.imggen.Source` for details.
     :return: :class:`Rays` object.
     :rtype: imggen.patterns.Rays
     """
+    # The rays are the same in every frame.
+    invariant_axes = (Z,)
+
     def __init__(
         self, count: int,
-        offset: float = 0
+        offset: float = 0,
+        dtype: DTypeLike = 'float64',
+        broadcast: bool = False
     ) -> None:
         self.count = int(count)
         self.offset = float(offset)
+        self.dtype = dtype
+        self.broadcast = broadcast
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
@@ -351,22 +727,13 @@ class Rays(Source):
         center = [(n - 1) / 2 + o for n, o in zip(size, loc)]
 
         # Determine the angle from center for every point
-        # in the array.
-        indices = np.indices(size, dtype=float)
-        for axis in X, Y:
-            indices[axis] -= center[axis]
-        x, y = indices[X], indices[Y]
-        angle = np.zeros_like(x)
-        angle[x != 0] = np.arctan(y[x != 0] / x[x != 0])
-
-        # Correct for inaccuracy of the arctan function when one or
-        # both of the coordinates is less than zero.
-        m = np.zeros_like(x)
-        m[x < 0] += 1
-        m[y < 0] += 3
-        angle[m == 1] += np.pi
-        angle[m == 4] += np.pi
-        angle[m == 3] += 2 * np.pi
+        # in the array. The rays don't change along the Z axis,
+        # so only one frame is needed.
+        angle = angle_field(
+            tuple(size[Y:]),
+            (center[Y], center[X]),
+            self._work_dtype
+        )
 
         # Create the rays.
         ray_angle = 2 * np.pi / self.count
@@ -377,8 +744,7 @@ class Rays(Source):
         if center[X] % 1 == 0 and center[Y] % 1 == 0:
             center = [int(n) for n in center]
             rays[(center[Y], center[X])] = 1
-        rays = np.tile(rays, (size[Z], 1, 1))
-        return rays
+        return self._output(rays[np.newaxis, ...], size, out)
 
 
 class Rings(Source):
@@ -402,6 +768,7 @@ class Rings(Source):
         there is only one ring.
     :param count: (Optional.) The number of rings to draw. The
         default is one.
+    :param dtype: (Optional.) The data type of the image data.
     :return: :class:`Rings` object.
     :rtype: imggen.patterns.Rings
     """
@@ -409,51 +776,89 @@ class Rings(Source):
         self, radius: float,
         width: float,
         gap: float = 0,
-        count: int = 1
+        count: int = 1,
+        dtype: DTypeLike = 'float64'
     ) -> None:
         """Initialize an instance of Ring."""
         self.radius = float(radius)
         self.width = float(width)
         self.gap = float(gap)
         self.count = int(count)
+        self.dtype = dtype
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
         # Map out the volume of space that will be created.
-        a = np.zeros(size)
-        c = np.indices(size)
-        for axis in X, Y, Z:
-            c[axis] += loc[axis]
-
-            # Calculate where every point is relative to the center
-            # of the spot.
-            c[axis] = abs(c[axis] - size[axis] // 2)
-
-        # Perform a spherical interpolation on the points in the
-        # volume and run the easing function on the results.
-        c = np.sqrt(c[X] ** 2 + c[Y] ** 2)
-        for i in range(self.count):
-            radius = self.radius + self.gap * i
-            if radius != 0:
-                working = c / np.sqrt(radius ** 2)
-                working = np.abs(working - 1)
-                wr = self.width / 2 / radius
-                m = np.zeros(working.shape, bool)
-                m[working <= wr] = True
-                a[m] = working[m] * (radius / (self.width / 2))
-                a[m] = 1 - a[m]
-        return a
+        a = self._blank(size, out)
+        center = [n // 2 - o for n, o in zip(size, loc)]
+        c = radius_field(
+            tuple(size[Y:]),
+            (center[Y], center[X]),
+            self._work_dtype
+        )
+
+        # Rings without a positive radius aren't drawn.
+        radii = self.radius + self.gap * np.arange(self.count)
+        drawn = np.flatnonzero(radii > 0)
+        if not len(drawn):
+            return self._output(a, size, out)
+        top = drawn[-1]
+
+        # When rings overlap, the ones drawn later are on top. So,
+        # the color of a pixel comes from the last ring whose band
+        # the pixel is in. Find the last ring whose band could reach
+        # the pixel, then check it and the rings on either side of it
+        # to allow for rounding.
+        if self.gap:
+            edge = self.width / 2 if self.gap > 0 else -self.width / 2
+            last = np.floor((c.astype(float) + edge - self.radius) / self.gap)
+            last = np.clip(last, -1, top + 1).astype(int)
+        else:
+            last = np.full(c.shape, top)
+        for offset in -1, 0, 1:
+            index = np.clip(last + offset, 0, top)
+            self._draw_ring(a, c, index)
+        return self._output(a, size, out)
+
+    # Private methods.
+    def _draw_ring(
+        self, a: ImgAry,
+        c: ImgAry,
+        index: NDArray[np.int_]
+    ) -> None:
+        """Draw the given ring at each pixel that is in its band.
+
+        :param a: The image data to draw on.
+        :param c: The distance from each pixel to the center.
+        :param index: The ring to draw for each pixel.
+        :return: None.
+        :rtype: NoneType
+        """
+        radius = self.radius + self.gap * index
+        drawn = radius != 0
+        radius[~drawn] = 1
+        working = c / np.sqrt(radius ** 2).astype(c.dtype)
+        working = np.abs(working - 1)
+        wr = (self.width / 2 / radius).astype(c.dtype)
+        drawn &= working <= wr
+        with np.errstate(divide='ignore', invalid='ignore'):
+            working *= (radius / (self.width / 2)).astype(c.dtype)
+        np.subtract(1, working, out=a, where=drawn)
 
 
 class Solid(Source):
@@ -467,28 +872,47 @@ class Solid(Source):
 
     :param color: The color to use for the fill. Zero is black. One
         is white. The values between are values of gray.
+    :param dtype: (Optional.) The data type of the image data.
+    :param broadcast: (Optional.) Whether to return a read-only view
+        that repeats the image data along the axes it doesn't change
+        along rather than a new array. See
+        :class:`imggen.imggen.Source` for details.
     :return: :class:`Solid` object.
     :rtype: pjinoise.sources.Solid
     """
-    def __init__(self, color: float) -> None:
+    # Tiles of this source line up with each other.
+    loc_consistent = True
+
+    # The color is the same everywhere.
+    invariant_axes = (Z, Y, X)
+
+    def __init__(
+        self, color: float,
+        dtype: DTypeLike = 'float64',
+        broadcast: bool = False
+    ) -> None:
         self.color = float(color)
+        self.dtype = dtype
+        self.broadcast = broadcast
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        a = np.zeros(size, dtype=float)
-        a.fill(self.color)
-        return a
+        return self._output(np.array(self.color), size, out)
 
 
 class Spheres(Source):
@@ -513,81 +937,110 @@ class Spheres(Source):
     :param round: (Optional.) Whether to apply a circular easing
         function to output to give the appearance of the exterior
         of a sphere.
+    :param dtype: (Optional.) The data type of the image data.
     :return: :class:`Spheres` object.
     :rtype: imggen.patterns.Spheres
     """
+    # Tiles of this source line up with each other.
+    loc_consistent = True
+
     def __init__(
         self, radius: float,
         offset: str = '',
         cells: bool = False,
-        round: bool = True
+        round: bool = True,
+        dtype: DTypeLike = 'float64'
     ) -> None:
         self.cells = cells
         self.offset = offset
         self.radius = float(radius)
         self.round = round
+        self.dtype = dtype
+
+    # Properties.
+    @property
+    def period(self) -> Optional[Size]:
+        """The number of pixels along each axis after which the image
+        data repeats. The spheres only repeat exactly when their
+        diameter is a whole number of pixels. Offset rows or columns
+        repeat after two spheres.
+        """
+        diameter = self.radius * 2
+        if diameter <= 0 or not diameter.is_integer():
+            return None
+        n = int(diameter)
+        period = [n, n, n]
+        if self.offset == 'x':
+            period[Y] *= 2
+        if self.offset == 'y':
+            period[X] *= 2
+        return tuple(period)
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        # Map out the volume of space that will be created.
-        a = np.indices(size, dtype=float)
-        for axis in X, Y, Z:
-            a[axis] += loc[axis]
+        # Map out the volume of space that will be created. Only
+        # one period of it needs to be generated.
+        a = open_grid(self._period_size(size), loc, self._work_dtype)
 
         # If configured, offset every other row, column, or plane by
         # by the radius of the circle.
         if self.offset == 'x':
-            mask = np.zeros(a[Y].shape, bool)
             d = self.radius * 2
             dd = d * 2
-            mask[a[Y] % dd < d] = True
+            mask = a[Y] % dd < d
 
             # Note: This used to be just subtracting the radius from
             # a[X][~mask], but it stopped working. I'm not sure why.
             # Maybe it never did, and my headache was keeping me from
             # noticing it. Either way, this seems to work.
-            a[X][mask] = a[X][mask] + self.radius
-            a[Y][mask] = a[Y][mask] + self.radius
-            a[Y][~mask] = a[Y][~mask] + self.radius
+            a[X] = np.where(mask, a[X] + self.radius, a[X])
+            a[Y] = a[Y] + self.radius
 
         if self.offset == 'y':
-            mask = np.zeros(a[X].shape, bool)
             d = self.radius * 2
             dd = d * 2
-            mask[a[X] % dd < d] = True
+            mask = a[X] % dd < d
 
             # Note: For some reason, this is not the same as just
             # subtracting the radius from a[Y][mask]. I don't know
             # why, and my headache is making me disinclined to look
             # at the math.
-            a[X][mask] = a[X][mask] + self.radius
-            a[X][~mask] = a[X][~mask] + self.radius
-            a[Y][~mask] = a[Y][~mask] + self.radius
+            a[X] = a[X] + self.radius
+            a[Y] = np.where(mask, a[Y], a[Y] + self.radius)
 
         # Split the volume into unit cubes that are the size of the
         # diameter of the circle. Then adjust the indicies to measure
         # the distance to the nearest unit rather than the distance
         # from the last unit.
-        a = a % (self.radius * 2)
-        a[a > self.radius] = self.radius * 2 - a[a > self.radius]
+        for axis in X, Y, Z:
+            a[axis] = a[axis] % (self.radius * 2)
+            a[axis] = np.where(
+                a[axis] > self.radius,
+                self.radius * 2 - a[axis],
+                a[axis]
+            )
 
         # Interpolate the unit distances through the sphere equation
         # to generate the regularly spaced spheres in the volume.
         # Then run the easing function on those spheres.
         a = np.sqrt(a[X] ** 2 + a[Y] ** 2 + a[Z] ** 2)
         if self.cells:
-            a = (a / np.sqrt(3 * self.radius ** 2))
+            a = (a / sqrt(3 * self.radius ** 2))
         else:
             a[a > self.radius] = self.radius
             a /= self.radius
@@ -595,7 +1048,8 @@ class Spheres(Source):
             a = np.sqrt(1 - a ** 2)
         else:
             a = 1 - a
-        return a
+        a = self._repeat(a, size)
+        return self._output(a, size, out)
 
 
 class Spot(Source):
@@ -608,41 +1062,48 @@ class Spot(Source):
        Output of :class:`Spot`.
 
     :param radius: The radius of the spot.
+    :param dtype: (Optional.) The data type of the image data.
     :return: :class:`Spot` object.
     :rtype: imggen.patterns.Spot
     """
-    def __init__(self, radius: float, *args, **kwargs) -> None:
+    def __init__(
+        self, radius: float,
+        *args,
+        dtype: DTypeLike = 'float64',
+        **kwargs
+    ) -> None:
         self.radius = float(radius)
+        self.dtype = dtype
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        # Map out the volume of space that will be created.
-        a = np.indices(size, dtype=float)
-        for axis in X, Y, Z:
-            a[axis] += loc[axis]
-
-            # Calculate where every point is relative to the center
-            # of the spot.
-            a[axis] = abs(a[axis] - size[axis] // 2)
-
-        # Perform a spherical interpolation on the points in the
-        # volume and run the easing function on the results.
-        a = np.sqrt(a[X] ** 2 + a[Y] ** 2)
-        a = 1 - (a / np.sqrt(2 * self.radius ** 2))
+        # Find the distance from every point to the center of the
+        # spot, and run the easing function on the results.
+        center = [n // 2 - o for n, o in zip(size, loc)]
+        a = radius_field(
+            tuple(size[Y:]),
+            (center[Y], center[X]),
+            self._work_dtype
+        )
+        a = 1 - (a / sqrt(2 * self.radius ** 2))
         a[a > 1] = 1
         a[a < 0] = 0
-        return a
+        return self._output(a, size, out)
 
 
 class Text(Source):
@@ -654,7 +1115,9 @@ class Text(Source):
        
        Output of :class:`Text`.
 
-    :param text: The text to add.
+    :param text: The text to add. If a sequence of strings is given,
+        each frame shows the next string in the sequence, and the text
+        disappears when the sequence runs out.
     :param font: (Optional.) The font for the text. It uses the fonts
         available to your system.
     :param size: (Optional.) The size of the text in points.
@@ -679,11 +1142,17 @@ class Text(Source):
     :param stroke_width: (Optional.) The width of the stroke around the
         characters.
     :param stroke_color: (Optional.) The color to use for the stroke.
+    :param dtype: (Optional.) The data type of the image data.
+    :param atlas: (Optional.) Whether to build the text from a
+        :class:`GlyphAtlas` rather than drawing it. Each glyph is only
+        drawn once, so this is much faster when the text changes from
+        frame to frame. Glyphs are placed without kerning, and strokes
+        aren't supported.
     :return: A :class:`Text` object.
     :rtype: imggen.patterns.Text
     """
     def __init__(
-        self, text: str,
+        self, text: Union[str, Sequence[str]],
         font: str = 'Verdana',
         size: int = 10,
         face: int = 0,
@@ -698,7 +1167,9 @@ class Text(Source):
         spacing_mode: str = 'proportional',
         align: Literal['left', 'center', 'right'] = 'left',
         stroke_width: int = 0,
-        stroke_fill: int = 0
+        stroke_fill: int = 0,
+        dtype: DTypeLike = 'float64',
+        atlas: bool = False
     ) -> None:
         self.text = text
         self.font = font
@@ -730,8 +1201,20 @@ class Text(Source):
         self.align = align
         self.stroke_width = stroke_width
         self.stroke_fill = stroke_fill
+        self.dtype = dtype
 
-        self._font = ImageFont.truetype(
+        if atlas and stroke_width:
+            msg = 'Strokes are not supported when drawing from an atlas.'
+            raise ValueError(msg)
+        self.atlas = atlas
+
+        self._font = _load_font(*self._font_key)
+
+    # Properties.
+    @property
+    def _font_key(self) -> FontKey:
+        """The values that identify the font of the text."""
+        return (
             self.font, self.size, self.face,
             self.encoding, self.layout_engine
         )
@@ -739,17 +1222,21 @@ class Text(Source):
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        a = np.zeros(size, float)
+        a = self._blank(size, out)
         origin = (
             self.origin[0] + loc[Y],
             self.origin[1] + loc[X],
@@ -759,27 +1246,76 @@ class Text(Source):
             end = size[Z]
         else:
             end = start + self.duration
+        if not isinstance(self.text, str):
+            end = min(end, start + len(self.text))
+        frames = range(max(start, 0), min(end, size[Z]))
+        if not frames:
+            return self._output(a, size, out)
+
+        if self.atlas:
+            self._fill_atlas(a, frames, start, origin)
+        elif isinstance(self.text, str):
+            # The text is the same in every frame it appears in, so
+            # it's only drawn once.
+            a[frames.start:frames.stop] = self._draw(size, self.text, origin)
+        else:
+            for i in frames:
+                a[i] = self._draw(size, self.text[i - start], origin)
+        return self._output(a, size, out)
 
-        img = Image.new('L', (size[X], size[Y]), self.bg_color)
-        draw = ImageDraw.Draw(img)
-        draw.text(
-            xy=origin,
-            text=self.text,
-            fill=self.fill_color,
-            font=self._font,
-            anchor=None,
-            spacing=self.spacing,
-            align=self.align,
-            stroke_width=self.stroke_width,
-            stroke_fill=self.stroke_fill
+    # Private methods.
+    def _draw(
+        self, size: Size,
+        text: str,
+        origin: tuple[float, float]
+    ) -> ImgAry:
+        """Draw text on a frame."""
+        return _draw_text(
+            (size[X], size[Y]),
+            self._font_key,
+            text,
+            origin,
+            self.fill_color,
+            self.bg_color,
+            self.spacing,
+            self.align,
+            self.stroke_width,
+            self.stroke_fill
         )
-        for i in range(a.shape[Z]):
-            if i >= end:
-                break
-            if i >= start:
-                a[i] = (np.array(img).astype(float) / 0xff)
 
-        return a
+    def _fill_atlas(
+        self, a: ImgAry,
+        frames: range,
+        start: int,
+        origin: tuple[float, float]
+    ) -> None:
+        """Build the text in each frame from the glyphs in an atlas."""
+        texts = [self.text] if isinstance(self.text, str) else self.text
+        chars = ''.join(sorted(set(''.join(texts)) - {'\n'}))
+        atlas = glyph_atlas(self._font_key, chars)
+
+        # Frames with the same text as an earlier frame are copied
+        # rather than built again.
+        built: dict[str, int] = {}
+        for i in frames:
+            text = self.text
+            if not isinstance(text, str):
+                text = text[i - start]
+            if text in built:
+                a[i] = a[built[text]]
+                continue
+            built[text] = i
+            placed = _layout_text(
+                atlas, text, origin, self.spacing, self.align
+            )
+            for glyph, top, left in placed:
+                _paste_glyph(a[i], atlas.glyphs[glyph], top, left)
+
+        # The glyphs give the coverage of each pixel, which is then
+        # shaded from the background color to the fill color.
+        shaded = a[frames.start:frames.stop]
+        shaded *= (self.fill_color - self.bg_color) / 0xff
+        shaded += self.bg_color / 0xff
 
 
 class Waves(Source):
@@ -796,57 +1332,92 @@ class Waves(Source):
         string 'geometric'. Determines whether the distance between
         each circle remains constant (linear) or increases
         (geometric). Defaults to linear.
+    :param dtype: (Optional.) The data type of the image data.
     :returns: :class:`Waves` object.
     :rtype: imggen.patterns.Waves
     """
     def __init__(
         self, length: float,
-        growth: str = 'l'
+        growth: str = 'l',
+        dtype: DTypeLike = 'float64'
     ) -> None:
         """Initialize an instance of Waves."""
         self.length = float(length)
         self.growth = growth
+        self.dtype = dtype
 
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
         # Map out the volume of space that will be created.
-        a = np.zeros(size, dtype=float)
-        c = np.indices(size, dtype=float)
+        a = self._blank(size, out)
         center = [(n - 1) / 2 + o for n, o in zip(size, loc)]
-        for axis in X, Y, Z:
-            c[axis] -= center[axis]
-
-        # Perform a spherical interpolation on the points in the
-        # volume and run the easing function on the results.
-        c = np.sqrt(c[X] ** 2 + c[Y] ** 2)
+        c = radius_field(
+            tuple(size[Y:]),
+            (center[Y], center[X]),
+            self._work_dtype
+        )
         if self.growth == 'l' or self.growth == 'linear':
-            a = c % self.length
+            a[...] = c % self.length
             a /= self.length
-            a = abs(a - .5) * 2
+            a[...] = abs(a - .5) * 2
 
         elif self.growth == 'g' or self.growth == 'geometric':
-            in_length = 0.0
-            out_length = self.length
-            while in_length < np.max(c):
-                m = np.ones(a.shape, bool)
-                m[c < in_length] = False
-                m[c > out_length] = False
-                a[m] = c[m]
-                a[m] -= in_length
-                a[m] /= out_length - in_length
-                a[m] = abs(a[m] - .5) * 2
-                in_length = out_length
-                out_length *= 2
-
-        return a
+            if np.max(c) > 0:
+                a[...] = self._fill_geometric(c)
+
+        return self._output(a, size, out)
+
+    # Private methods.
+    def _fill_geometric(self, c: ImgAry) -> ImgAry:
+        """Draw the waves when the length of each wave is twice the
+        length of the one inside it.
+
+        :param c: The distance from each pixel to the center.
+        :return: The image data as a :class:`numpy.ndarray`.
+        :rtype: numpy.ndarray
+        """
+        # The first wave goes from the center to the length, and
+        # each wave after that starts at the end of the one inside
+        # it. The logarithm gives the wave a pixel is in, but it can
+        # be off by one due to rounding, so that's checked against
+        # the edges of the wave.
+        dist = c.astype(float)
+        with np.errstate(divide='ignore'):
+            index = np.floor(np.log2(dist / self.length)) + 1
+        index = np.maximum(index, 0).astype(int)
+        for step in -1, 1:
+            in_length, out_length = self._wave_edges(index, c.dtype)
+            if step < 0:
+                index[c < in_length] -= 1
+            else:
+                index[c > out_length] += 1
+
+        in_length, out_length = self._wave_edges(index, float)
+        length = (out_length - in_length).astype(c.dtype)
+        a = c - in_length.astype(c.dtype)
+        a /= length
+        return abs(a - .5) * 2
+
+    def _wave_edges(
+        self, index: NDArray[np.int_],
+        dtype: DTypeLike
+    ) -> tuple[ImgAry, ImgAry]:
+        """Find the inner and outer edges of the given waves."""
+        out_length = self.length * 2.0 ** index
+        in_length = np.where(index > 0, out_length / 2, 0.0)
+        return in_length.astype(dtype), out_length.astype(dtype)
@@ -4,10 +4,10 @@ perlin
 
 Image data sources that create Perlin noise.
 """
-from typing import Sequence
+from typing import Optional, Sequence
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 
 from imggen import unitnoise as un
 from imggen.imggen import ImgAry, Loc, Size, X, Y, Z
@@ -17,6 +17,29 @@ from imggen.imggen import ImgAry, Loc, Size, X, Y, Z
 __all__ = ['OctavePerlin', 'Perlin',]
 
 
+# The gradients for Perlin noise. The last four bits of the hash of
+# a vertex of the unit grid are the index of its gradient. Each row
+# is the part of the gradient along the Z, Y, and X axes.
+GRADIENTS = np.array([
+    [0, 1, 1],
+    [0, 1, -1],
+    [0, -1, 1],
+    [0, -1, -1],
+    [1, 0, 1],
+    [1, 0, -1],
+    [-1, 0, 1],
+    [-1, 0, -1],
+    [1, 1, 0],
+    [1, -1, 0],
+    [-1, 1, 0],
+    [-1, -1, 0],
+    [0, 1, 1],
+    [1, -1, 0],
+    [0, 1, -1],
+    [-1, -1, 0],
+], dtype=np.int8)
+
+
 # Public class.
 class Perlin(un.UnitNoise):
     """A class to generate Perlin noise.
@@ -52,99 +75,124 @@ class Perlin(un.UnitNoise):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
     :return: :class:Perlin object.
     :rtype: imggen.perlin.Perlin
     """
+    # Tiles of this source line up with each other.
+    loc_consistent = True
+
     def __init__(
         self, unit: Sequence[int],
         min: int = 0x00,
         max: int = 0xff,
         repeats: int = 1,
-        seed: un.Seed = None
+        seed: un.Seed = None,
+        dtype: DTypeLike = 'float64'
     ) -> None:
         """Initialize an instance of UnitNoise."""
-        super().__init__(unit, min, max, repeats, seed)
+        super().__init__(unit, min, max, repeats, seed, dtype)
 
     # Public classes.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        shape = self._calc_unit_grid_shape(size)
-        whole, parts = self._map_unit_grid(size, loc)
-        fades = 6 * parts ** 5 - 15 * parts ** 4 + 10 * parts ** 3
-        grids = self._build_grids(whole, size, shape)
-        for grid in grids:
-            grids[grid] = self._grad(grid, grids[grid], parts)
-        a = self._interp(grids, fades)
-        return (a + 1) / 2
+        wholes, parts = self._map_unit_axes(size, loc)
+        fades = [6 * p ** 5 - 15 * p ** 4 + 10 * p ** 3 for p in parts]
+        vertices, indices = self._find_vertices(wholes)
+        grads = self._build_gradients(vertices)
+        a = self._interp_gradients(grads, indices, parts, fades)
+        a += 1
+        a /= 2
+        return self._output(a, size, out)
 
     # Private methods.
-    def _build_grids(
-        self, whole: np.ndarray,
-        size: Sequence[float],
-        shape: Sequence[int]
-    ) -> dict[str, np.ndarray]:
-        """Get the color for the eight vertices that surround each of
-        the pixels.
+    def _build_gradients(
+        self, vertices: Sequence[NDArray[np.int_]]
+    ) -> NDArray[np.int8]:
+        """Get the gradient at each vertex of the unit grid that
+        surrounds the pixels. The first axis of the returned array
+        is the part of the gradient along each axis.
         """
-        grids = {}
-        for key in self._hashes:
-            grid_whole = whole.copy()
-            for axis in range(self._axes):
-                grid_whole[axis] += int(key[axis])
-
-            a_grid = grid_whole[Z].astype(np.int64)
-            for axis in (Y, X):
-                a_grid = np.take(self._table, a_grid) + grid_whole[axis]
-
-            grids[key] = a_grid
-        return grids
-
-    def _grad(self, loc_mask, grid, parts):
-        """To be honest, I don't fully understand what this part of
-        the Perlin noise algorithm is doing. It's called the
-        gradient, so it must have something to do with how the
-        level of noise changes between unit vertices. Beyond that
-        I'm not sure.
+        # Hash the location of the vertex through the table.
+        table = np.array(self._table)
+        hashes = self._expand(vertices[Z], Z)
+        for axis in (Y, X):
+            hashes = np.take(table, hashes)
+            hashes = hashes + self._expand(vertices[axis], axis)
+
+        # The last four bits of the hash pick the gradient.
+        return np.take(GRADIENTS.T, hashes & 0xf, axis=1)
+
+    def _dot(
+        self, grads: NDArray[np.int8],
+        indices: Sequence[NDArray[np.intp]],
+        dists: Sequence[NDArray[np.float_]],
+        corner: Sequence[int]
+    ) -> ImgAry:
+        """Find the dot product of the gradient at a corner of the unit
+        cube around each pixel and the distance from the pixel to that
+        corner.
+        """
+        # Gather the gradients for the pixels one axis at a time. The
+        # first axis of the gradients is the part of the gradient.
+        for axis in range(self._axes):
+            grads = np.take(grads, indices[axis] + corner[axis], axis + 1)
+
+        a = grads[X] * self._expand(dists[X], X)
+        for axis in (Y, Z):
+            a += grads[axis] * self._expand(dists[axis], axis)
+        return a
+
+    def _interp_gradients(
+        self, grads: NDArray[np.int8],
+        indices: Sequence[NDArray[np.intp]],
+        parts: Sequence[NDArray[np.float_]],
+        fades: Sequence[NDArray[np.float_]]
+    ) -> ImgAry:
+        """Interpolate the values of each pixel of image data from the
+        gradients at the corners of the unit cube around it.
         """
-        z = parts[Z].copy()
-        y = parts[Y].copy()
-        x = parts[X].copy()
-        if loc_mask[0] == '1':
-            z -= 1
-        if loc_mask[1] == '1':
-            y -= 1
-        if loc_mask[2] == '1':
-            x -= 1
-
-        m = grid & 0xf
-        out = np.zeros_like(x)
-        out[m == 0x0] = x[m == 0x0] + y[m == 0x0]
-        out[m == 0x1] = -x[m == 0x1] + y[m == 0x1]
-        out[m == 0x2] = x[m == 0x2] - y[m == 0x2]
-        out[m == 0x3] = -x[m == 0x3] - y[m == 0x3]
-        out[m == 0x4] = x[m == 0x4] + z[m == 0x4]
-        out[m == 0x5] = -x[m == 0x5] + z[m == 0x5]
-        out[m == 0x6] = x[m == 0x6] - z[m == 0x6]
-        out[m == 0x7] = -x[m == 0x7] - z[m == 0x7]
-        out[m == 0x8] = y[m == 0x8] + z[m == 0x8]
-        out[m == 0x9] = -y[m == 0x9] + z[m == 0x9]
-        out[m == 0xa] = y[m == 0xa] - z[m == 0xa]
-        out[m == 0xb] = -y[m == 0xb] - z[m == 0xb]
-        out[m == 0xc] = y[m == 0xc] + x[m == 0xc]
-        out[m == 0xd] = -y[m == 0xd] + z[m == 0xd]
-        out[m == 0xe] = y[m == 0xe] - x[m == 0xe]
-        out[m == 0xf] = -y[m == 0xf] - z[m == 0xf]
-        return out.astype(float)
+        # The distance from each pixel to the vertices before and
+        # after it along each axis.
+        dists = [(p, p - 1) for p in parts]
+
+        # Each corner is only needed until it's been interpolated, so
+        # interpolate the corners one pair at a time to keep as few
+        # arrays the size of the image data around as possible.
+        def lerp(before: ImgAry, after: ImgAry, axis: int) -> ImgAry:
+            x = self._expand(fades[axis], axis)
+            before *= 1 - x
+            after *= x
+            before += after
+            return before
+
+        planes = []
+        for z in (0, 1):
+            rows = []
+            for y in (0, 1):
+                cols = []
+                for x in (0, 1):
+                    corner = (z, y, x)
+                    corner_dists = [dists[Z][z], dists[Y][y], dists[X][x]]
+                    dot = self._dot(grads, indices, corner_dists, corner)
+                    cols.append(dot)
+                rows.append(lerp(*cols, X))
+            planes.append(lerp(*rows, Y))
+        return lerp(*planes, Z)
 
 
 # Octave unit noise classes.
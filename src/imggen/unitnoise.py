@@ -4,15 +4,18 @@ unitnoise
 
 Image data sources that create unit noise.
 """
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
 from operator import mul, truediv
-from typing import Callable, NamedTuple, Sequence, Union
+from typing import (
+    Any, Callable, Iterable, NamedTuple, Optional, Sequence, Union
+)
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 
 from imggen.imggen import ImgAry, Loc, Size, Source, X, Y, Z
 from imggen.noise import Noise, Seed
-from imggen.utility import lerp
 
 
 # Names available for import.
@@ -54,18 +57,24 @@ class UnitNoise(Noise):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
     :return: An instance of :class:`UnitNoise`.
     :rtype: imggen.unitnoise.UnitNoise
     """
     # The number of dimensions the noise occurs in.
     _axes: int = 3
 
+    # The unit grid is hashed from the size of the fill, so tiles
+    # of this source don't line up with each other.
+    loc_consistent = False
+
     def __init__(
         self, unit: Sequence[float],
         min: int = 0x00,
         max: int = 0xff,
         repeats: int = 0,
-        seed: Seed = None
+        seed: Seed = None,
+        dtype: DTypeLike = 'float64'
     ) -> None:
         """Initialize an instance of UnitNoise."""
         # Initialize public values.
@@ -73,61 +82,51 @@ class UnitNoise(Noise):
         self.min = min
         self.max = max
         self.repeats = repeats
-        super().__init__(seed)
+        super().__init__(seed, dtype)
 
         # Initialize the randomized table.
         self._table = self._init_table()
 
-        # Prime the names of the grids used for interpolation.
-        tmp = '{:>0' + str(self._axes) + 'b}'
-        self._hashes = [tmp.format(n) for n in range(2 ** self._axes)]
-
     # Public methods.
     def fill(
         self, size: Size,
-        location: Loc = (0, 0, 0)
+        location: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
         shape = self._calc_unit_grid_shape(size)
-        whole, parts = self._map_unit_grid(size, location)
-        grids = self._build_grids(whole, size, shape)
-        a = self._interp(grids, parts)
-        return a / (self.max - self.min)
+        wholes, parts = self._map_unit_axes(size, location)
+        vertices, indices = self._find_vertices(wholes)
+        lattice = self._build_lattice(vertices, shape)
+        a = self._interp_lattice(lattice, indices, parts)
+        a /= self.max - self.min
+        return self._output(a, size, out)
 
     # Private methods.
-    def _build_grids(
-        self, whole: NDArray[np.int_],
-        size: Sequence[int],
+    def _build_lattice(
+        self, vertices: Sequence[NDArray[np.int_]],
         shape: Sequence[int]
-    ) -> dict[str, NDArray[np.int64]]:
-        """Get the color for the eight vertices that surround each of
-        the pixels.
-        """
-        grids = {}
-        for key in self._hashes:
-            grid_whole = whole.copy()
-            a_grid = np.zeros(size, dtype=np.int64)
-            for axis in range(self._axes):
-                grid_whole[axis] += int(key[axis])
-
-            for axis in range(self._axes):
-                remaining_axes = range(self._axes)[axis + 1:]
-                axis_incr = 1
-                for r_axis in remaining_axes:
-                    axis_incr *= shape[r_axis]
-                a_grid += grid_whole[axis] * axis_incr
-                a_grid %= len(self._table)
-
-            a_grid = np.take(self._table, a_grid)
-            grids[key] = a_grid
-        return grids
+    ) -> NDArray[np.int64]:
+        """Get the color of the vertices of the unit grid."""
+        hashes = np.zeros([len(v) for v in vertices], dtype=np.int64)
+        for axis in range(self._axes):
+            remaining_axes = range(self._axes)[axis + 1:]
+            axis_incr = 1
+            for r_axis in remaining_axes:
+                axis_incr *= shape[r_axis]
+            hashes += self._expand(vertices[axis], axis) * axis_incr
+        hashes %= len(self._table)
+        return np.take(self._table, hashes)
 
     def _calc_unit_grid_shape(self, size: Sequence[int]):
         """Determine the shape of the unit grid."""
@@ -140,6 +139,23 @@ class UnitNoise(Noise):
 
         return shape
 
+    def _find_vertices(
+        self, wholes: Sequence[NDArray[np.int_]]
+    ) -> tuple[list[NDArray[np.int_]], list[NDArray[np.intp]]]:
+        """Find the vertices of the unit grid that surround the pixels
+        along each axis, and the index of the vertex before each pixel.
+        """
+        # Only the vertices next to a pixel are needed. Since the
+        # vertices are whole numbers, the vertex after a pixel is
+        # always next to the vertex before it in the sorted vertices.
+        vertices = []
+        indices = []
+        for whole in wholes:
+            axis_vertices = np.union1d(whole, whole + 1)
+            vertices.append(axis_vertices)
+            indices.append(np.searchsorted(axis_vertices, whole))
+        return vertices, indices
+
     def _init_table(self) -> list[int]:
         """Create the table of randomized values for the unit grid."""
         table = []
@@ -148,47 +164,61 @@ class UnitNoise(Noise):
         self._rng.shuffle(table)
         return table
 
-    def _map_unit_grid(
+    def _map_unit_axes(
         self, size: Sequence[int],
         location: Sequence[int]
-    ) -> tuple[NDArray[np.int_], NDArray[np.float_]]:
-        """Map the image data to the unit grid."""
-        # Map out the space.
-        a = np.indices(size, float)
+    ) -> tuple[list[NDArray[np.int_]], list[NDArray[np.float_]]]:
+        """Map each axis of the image data to the unit grid. Each
+        axis only depends on the position along that axis, so each
+        axis is mapped once rather than for every pixel.
+        """
+        wholes = []
+        parts = []
         for axis in range(self._axes):
-            a[axis] += location[axis]
-
-            # Split the space up into units.
-            a[axis] = a[axis] / self.unit[axis]
-            a[axis] %= 255
-
-        # The unit distances are split. The unit values are needed
-        # to set the color value of each vertex within the volume.
-        # The parts value is needed to interpolate the noise value
-        # at each pixel.
-        whole = (a // 1).astype(int)
-        parts = a - whole
-        return whole, parts
-
-    def _interp(
-        self, grids: Union[
-            dict[str, NDArray[np.int64]],
-            dict[str, NDArray[np.float_]]
-        ],
-        parts: NDArray[np.float_]
+            a = np.arange(size[axis], dtype=self._work_dtype)
+            a += location[axis]
+            a = a / self.unit[axis]
+            a %= 255
+            floor = a // 1
+            wholes.append(floor.astype(int))
+            parts.append(self._ease(a - floor))
+        return wholes, parts
+
+    def _ease(self, parts: NDArray[np.float_]) -> NDArray[np.float_]:
+        """Ease the distances between the vertices."""
+        return parts
+
+    def _expand(self, a: NDArray[Any], axis: int) -> NDArray[Any]:
+        """Shape a one-dimensional array to broadcast along an axis."""
+        shape = [1] * self._axes
+        shape[axis] = len(a)
+        return a.reshape(shape)
+
+    def _interp_lattice(
+        self, lattice: NDArray[np.int64],
+        indices: Sequence[NDArray[np.intp]],
+        parts: Sequence[NDArray[np.float_]]
     ) -> ImgAry:
-        """Interpolate the values of each pixel of image data."""
-        if len(grids) > 2:
-            new_grids = {}
-            evens = [k for k in grids if k.endswith('0')]
-            odds = [k for k in grids if k.endswith('1')]
-            for even, odd in zip(evens, odds):
-                new_key = even[:-1]
-                axis = len(new_key)
-                new_grids[new_key] = lerp(grids[even], grids[odd], parts[axis])
-            return self._interp(new_grids, parts)
-
-        return lerp(grids['0'], grids['1'], parts[Z])
+        """Interpolate the values of each pixel of image data from the
+        vertices of the unit grid. The interpolation is done one axis
+        at a time, starting with the last, so the other axes are still
+        the size of the vertices rather than the size of the image.
+        """
+        a = lattice
+        for axis in reversed(range(self._axes)):
+            x = self._expand(parts[axis], axis)
+            before = np.take(a, indices[axis], axis)
+            before = before.astype(x.dtype, copy=False)
+            after = np.take(a, indices[axis] + 1, axis)
+            after = after.astype(x.dtype, copy=False)
+
+            # This is a linear interpolation, done in place to avoid
+            # creating more arrays the size of the image data.
+            before *= 1 - x
+            after *= x
+            before += after
+            a = before
+        return a
 
 
 class Curtains(UnitNoise):
@@ -221,22 +251,45 @@ class Curtains(UnitNoise):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
+    :param broadcast: (Optional.) Whether to return a read-only view
+        that repeats the image data along the axes it doesn't change
+        along rather than a new array. See
+        :class:`imggen.imggen.Source` for details.
     :return: An instance of :class:`UnitNoise`.
     :rtype: imggen.unitnoise.UnitNoise
     """
     # The number of dimensions the noise occurs in.
     _axes: int = 2
 
+    # The curtains are the same from top to bottom.
+    invariant_axes = (Y,)
+
+    def __init__(
+        self, unit: Sequence[float],
+        min: int = 0x00,
+        max: int = 0xff,
+        repeats: int = 0,
+        seed: Seed = None,
+        dtype: DTypeLike = 'float64',
+        broadcast: bool = False
+    ) -> None:
+        """Initialize an instance of Curtains."""
+        super().__init__(unit, min, max, repeats, seed, dtype)
+        self.broadcast = broadcast
+
     # Public methods.
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Return a space filled with noise."""
         noise_size = (size[Z], size[X])
         noise_loc = (loc[Z], loc[X])
-        a = super().fill(noise_size, noise_loc)
-        return np.tile(a[:, np.newaxis, ...], (1, size[Y], 1))
+        a = np.empty(noise_size, dtype=self._work_dtype)
+        a = super().fill(noise_size, noise_loc, a)
+        return self._output(a[:, np.newaxis, ...], size, out)
 
 
 class CosineCurtains(Curtains):
@@ -271,18 +324,18 @@ class CosineCurtains(Curtains):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
+    :param broadcast: (Optional.) Whether to return a read-only view
+        that repeats the image data along the axes it doesn't change
+        along rather than a new array. See
+        :class:`imggen.imggen.Source` for details.
     :return: An instance of :class:`UnitNoise`.
     :rtype: imggen.unitnoise.UnitNoise
     """
     # Private methods.
-    def _map_unit_grid(
-        self, size: Sequence[int],
-        location: Sequence[int]
-    ) -> tuple[NDArray[np.int_], NDArray[np.float_]]:
-        """Map the image data to the unit grid."""
-        whole, parts = super()._map_unit_grid(size, location)
-        parts = (1 - np.cos(parts * np.pi)) / 2
-        return whole, parts
+    def _ease(self, parts: NDArray[np.float_]) -> NDArray[np.float_]:
+        """Ease the distances between the vertices."""
+        return (1 - np.cos(parts * np.pi)) / 2
 
 
 # Factories.
@@ -299,6 +352,7 @@ class OctaveNoiseDefaults(NamedTuple):
     :param max: (Optional.) The default value of max.
     :param repeats: (Optional.) The default value of repeats.
     :param seed: (Optional.) The default value of seed.
+    :param dtype: (Optional.) The default value of dtype.
     :return: An instance of :class:`OctaveNoiseDefaults`.
     :rtyoe: imggen.unitnoise.OctaveNoiseDefaults
     """
@@ -311,6 +365,7 @@ class OctaveNoiseDefaults(NamedTuple):
     max: int = 0xff
     repeats: int = 1
     seed: Seed = None
+    dtype: DTypeLike = 'float64'
 
 
 def octave_noise_factory(
@@ -363,6 +418,10 @@ def octave_noise_factory(
         :param persistence: How the weight of each octave changes.
         :param amplitude: The weight of the first octave.
         :param frequency: How the number of points in each octave changes.
+        :param workers: (Optional.) The number of threads used to
+            generate the octaves. If it's more than one, the octaves
+            are generated at the same time, which is faster but uses
+            more memory.
         :return: An octave version of the base class.
         :rtype: imggen.imggen.Source
         """
@@ -378,7 +437,9 @@ def octave_noise_factory(
             min: int = defaults.min,
             max: int = defaults.max,
             repeats: int = defaults.repeats,
-            seed: Seed = defaults.seed
+            seed: Seed = defaults.seed,
+            dtype: DTypeLike = defaults.dtype,
+            workers: int = 1
         ) -> None:
             self.octaves = octaves
             self.persistence = persistence
@@ -389,31 +450,76 @@ def octave_noise_factory(
             self.max = max
             self.repeats = repeats
             self.seed = seed
+            self.dtype = dtype
+            self.workers = workers
 
         def fill(
             self, size: Sequence[int],
-            loc: Sequence[int] = (0, 0, 0)
-        ) -> NDArray[np.float_]:
-            a = np.zeros(tuple(size), dtype=float)
-            max_value = 0.0
+            loc: Sequence[int] = (0, 0, 0),
+            out: Optional[ImgAry] = None
+        ) -> ImgAry:
+            a = self._blank(size, out)
+            octaves = self._build_octaves()
+            amps = [
+                self.amplitude + (self.persistence * i)
+                for i in range(self.octaves)
+            ]
+
+            # The octaves are always added in order, so the image data
+            # is the same no matter how many workers there are.
+            if self.workers > 1:
+                with ThreadPoolExecutor(self.workers) as executor:
+                    layers = executor.map(
+                        lambda octave: octave.fill(size, loc),
+                        octaves
+                    )
+                    self._add_layers(a, layers, amps)
+            else:
+                work = np.empty(tuple(size), dtype=self._work_dtype)
+                layers = (octave.fill(size, loc, work) for octave in octaves)
+                self._add_layers(a, layers, amps)
+
+            a /= sum(amps)
+            return self._output(a, size, out)
+
+        # Private methods.
+        def _add_layers(
+            self, a: ImgAry,
+            layers: Iterable[ImgAry],
+            amps: Sequence[float]
+        ) -> None:
+            """Add the weighted octaves to the image data."""
+            for layer, amp in zip(layers, amps):
+                layer *= amp
+                a += layer
+
+        def _build_octaves(self) -> list[UnitNoise]:
+            """Create the source for each octave."""
+            octaves: list[UnitNoise] = []
             for i in range(self.octaves):
-                amp = self.amplitude + (self.persistence * i)
                 freq = self.frequency * 2 ** i
                 unit = [self.unit_op(n, freq) for n in self.unit]
-                octave = self.source(
-                    unit=unit,
-                    min=self.min,
-                    max=self.max,
-                    repeats=self.repeats,
-                    seed=self.seed
-                )
-                a += octave.fill(size, loc) * amp
-                max_value += amp
-            a /= max_value
-            return a
+
+                # When seeded, every octave shuffles its table the same
+                # way, so the table only needs to be shuffled once.
+                if octaves and self.seed is not None:
+                    octave = copy(octaves[0])
+                    octave.unit = unit
+                else:
+                    octave = self.source(
+                        unit=unit,
+                        min=self.min,
+                        max=self.max,
+                        repeats=self.repeats,
+                        seed=self.seed,
+                        dtype=self._work_dtype
+                    )
+                octaves.append(octave)
+            return octaves
 
     cls = OctaveNoise
     cls.source = source
+    cls.loc_consistent = source.loc_consistent
     if not bork:
         cls.__name__ = 'Octave' + source.__name__
         if cls.__doc__ is not None:
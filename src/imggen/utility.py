@@ -5,7 +5,7 @@ utility
 Utility functions for imggen.
 """
 import numpy as np
-from numpy.typing import ArrayLike, NDArray
+from numpy.typing import ArrayLike, DTypeLike, NDArray
 
 from imggen.imggen import ImgAry
 
@@ -30,13 +30,19 @@ def print_array(a: NDArray, depth: int = 0, color: bool = True) -> None:
 
 
 # Interpolation utilities.
-def lerp(a: ArrayLike, b: ArrayLike, x: ArrayLike) -> ImgAry:
+def lerp(
+    a: ArrayLike,
+    b: ArrayLike,
+    x: ArrayLike,
+    dtype: DTypeLike = float
+) -> ImgAry:
     """Perform a linear interpolation on the values of two arrays
 
     :param a: The "left" values.
     :param b: The "right" values.
     :param x: An array of how close the location of the final value
         should be to the "left" value.
+    :param dtype: (Optional.) The data type of the interpolated values.
     :return: A :class:ndarray object
     :rtype: numpy.ndarray
 
@@ -50,7 +56,7 @@ def lerp(a: ArrayLike, b: ArrayLike, x: ArrayLike) -> ImgAry:
         >>> lerp(a, b, x)
         array([2., 3., 4.])
     """
-    a = np.array(a, dtype=float)
-    b = np.array(b, dtype=float)
-    x = np.array(x, dtype=float)
+    a = np.array(a, dtype=dtype)
+    b = np.array(b, dtype=dtype)
+    x = np.array(x, dtype=dtype)
     return a * (1 - x) + b * x
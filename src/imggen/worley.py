@@ -4,20 +4,43 @@ worley
 
 Image data sources that create Worley noise.
 """
-from typing import Optional, Sequence
+from itertools import product
+from typing import Iterator, Literal, NamedTuple, Optional, Sequence, Union
 
 import numpy as np
-from numpy.typing import NDArray
+from numpy.typing import DTypeLike, NDArray
 
-from imggen.imggen import ImgAry, Loc, Size, Source
-from imggen.noise import Noise, Seed
+from imggen.imggen import (
+    ImgAry, Loc, Size, Source, X, Y, Z, open_grid, tile_slices
+)
+from imggen.noise import Mode, Noise, Seed
 
 
 # Names available for import.
-__all__ = ['OctaveWorley', 'Worley',]
+__all__ = ['Features', 'OctaveWorley', 'Worley',]
+
+
+# Common types.
+Search = Literal['tiles', 'brute']
 
 
 # Public classes.
+class Features(NamedTuple):
+    """The distances from each pixel to the points around it, as
+    returned by :meth:`Worley.fill_features`.
+
+    :param f1: The distance in pixels to the nearest point.
+    :param f2: The distance in pixels to the second nearest point.
+    :param index: An integer that identifies the nearest point. It's
+        the index of the point unless the points are placed in cells,
+        in which case it's a hash of the location of the cell and the
+        point within the cell.
+    """
+    f1: ImgAry
+    f2: ImgAry
+    index: NDArray[np.int64]
+
+
 class Worley(Noise):
     """Fill a space with Worley noise.
 
@@ -38,7 +61,8 @@ class Worley(Noise):
 
     :param points: The number of cells in the image. A cell is a
         randomly placed point and the range of pixels that are
-        closer to it than any other point.
+        closer to it than any other point. If cell is given, this
+        is the number of points in each cell of the lattice.
     :param volume: (Optional.) The size of the volume that the points
         will be placed in. The default is for them to be evenly spread
         through the space generated during the fill.
@@ -53,61 +77,396 @@ class Worley(Noise):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
+    :param mode: (Optional.) How the random numbers are generated.
+        In "counter" mode, the points are placed the same way every
+        fill. See :class:`imggen.noise.Noise` for details.
+    :param search: (Optional.) How to find the nearest point to each
+        pixel. In "tiles" mode, the image is split into tiles, and
+        only the points that could be the nearest to a pixel in a
+        tile are checked for that tile. In "brute" mode, every point
+        is checked for every pixel. The image data is the same in
+        both modes, but "tiles" is much faster when there are a lot
+        of points.
+    :param cell: (Optional.) The size of the cells of a lattice that
+        fills the whole space. If it's given, the points are placed
+        randomly within each cell rather than within the volume, and
+        only the cells around a pixel are checked for the nearest
+        point. This makes the cost of each pixel the same no matter
+        how many points there are, and, since the points in each
+        cell are hashed from the seed and the location of the cell,
+        any part of the space can be filled on its own, and tiles
+        line up with each other. The distances are scaled by the
+        length of the diagonal of a cell. It can have two lengths
+        (Y and X) for cells that are the same in every frame, or
+        three (Z, Y, and X).
     :return: :class:`Worley` object.
     :rtype: imggen.worley.Worley
     """
+    # The size of the tiles used by the "tiles" search.
+    _tile: Size = (8, 32, 32)
+
     def __init__(
         self, points: int,
         volume: Optional[Size] = None,
         origin: Loc = (0, 0, 0),
-        seed: Seed = None
+        seed: Seed = None,
+        dtype: DTypeLike = 'float64',
+        mode: Mode = 'stream',
+        search: Search = 'tiles',
+        cell: Optional[Sequence[float]] = None
     ) -> None:
         self.points = points
         self.volume = volume
         self.origin = origin
-        super().__init__(seed)
+        self.search = search
+        self.cell = cell
+        super().__init__(seed, dtype, mode)
+
+    # Properties.
+    @property
+    def loc_consistent(self) -> bool:
+        """Whether tiles of this source line up with each other. The
+        image data is scaled by the farthest distance in the fill
+        unless the points are placed in cells.
+        """
+        return self.cell is not None
 
     def fill(
         self, size: Size,
-        loc: Loc = (0, 0, 0)
+        loc: Loc = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
         """Fill a volume with image data.
 
         :param size: The size of the volume of image data to generate.
         :param loc: (Optional.) How much to shift the starting point
             for the noise generation along each axis.
+        :param out: (Optional.) An existing array to put the image
+            data in. It must be the size of the volume. If it isn't
+            given, a new array is created.
         :return: An :class:`numpy.ndarray` with image data.
         :rtype: numpy.ndarray
         """
-        a = np.zeros(size, dtype=float)
+        if self.cell is not None:
+            dist = np.sqrt(self._cellular_sq(size, loc))
+            dist /= np.sqrt(sum(n ** 2 for n in self.cell))
+            return self._output(dist, size, out)
+
+        # Map the distances to the points. The square root doesn't
+        # change which point is nearest, so it only needs to be taken
+        # once at the end.
+        seeds = self._place_seeds(size)
+        max_dist = np.sqrt(sum(n ** 2 for n in size))
+        if self.search == 'brute':
+            indices = open_grid(size, dtype=self._work_dtype)
+            dist = np.full(size, np.inf, dtype=self._work_dtype)
+            for point in seeds:
+                np.minimum(dist, self._dist_sq(point, indices), out=dist)
+        else:
+            dist = self._nearest_sq(seeds, size)
+        np.sqrt(dist, out=dist)
+        np.minimum(dist, dist.dtype.type(max_dist), out=dist)
+
+        dist /= np.max(dist)
+        return self._output(dist, size, out)
+
+    def fill_features(
+        self, size: Size,
+        loc: Loc = (0, 0, 0)
+    ) -> Features:
+        """Find the distance to the nearest point, the distance to
+        the second nearest point, and which point is the nearest for
+        each pixel in a volume. They are all found in one pass through
+        the points, so this is faster than finding them separately.
+
+        Unlike :meth:`Worley.fill`, the distances are not scaled. If
+        there aren't enough points to find the second nearest one,
+        the distance is the length of the diagonal of the volume.
+
+        :param size: The size of the volume of image data to generate.
+        :param loc: (Optional.) How much to shift the starting point
+            for the noise generation along each axis. It's only used
+            when the points are placed in cells.
+        :return: A :class:`imggen.worley.Features` object.
+        :rtype: imggen.worley.Features
+        """
+        if self.cell is not None:
+            f1, f2, index = self._cellular_features(size, loc)
+        else:
+            seeds = self._place_seeds(size)
+            if self.search == 'brute':
+                f1, f2, index = self._brute_features(seeds, size)
+            else:
+                f1, f2, index = self._tiled_features(seeds, size)
+
+        max_dist = np.sqrt(sum(n ** 2 for n in size))
+        for dist in f1, f2:
+            np.sqrt(dist, out=dist)
+            np.minimum(dist, dist.dtype.type(max_dist), out=dist)
+        return Features(f1, f2, index)
+
+    # Private methods.
+    def _brute_features(
+        self, seeds: ImgAry,
+        size: Size
+    ) -> tuple[ImgAry, ImgAry, NDArray[np.int64]]:
+        """Find the squares of the distances to the nearest and second
+        nearest points and the index of the nearest point by checking
+        every point for every pixel.
+        """
+        indices = open_grid(size, dtype=self._work_dtype)
+        f1 = np.full(size, np.inf, dtype=self._work_dtype)
+        f2 = np.full(size, np.inf, dtype=self._work_dtype)
+        index = np.zeros(size, dtype=np.int64)
+        for i, point in enumerate(seeds):
+            work = self._dist_sq(point, indices)
+            self._update_features(f1, f2, index, work, i)
+        return f1, f2, index
+
+    def _cell_points(
+        self, size: Size,
+        loc: Loc
+    ) -> tuple[list[ImgAry], list[ImgAry], list[ImgAry], ImgAry]:
+        """Place the points in the cells around a volume.
+
+        :return: The coordinates of the pixels along each axis of the
+            cells, the index of the cell each pixel is in along each
+            axis, the location of the cells along each axis, and the
+            points. The first two axes of the points are the point
+            within the cell and the axis of the location of the point.
+        :rtype: tuple
+        """
+        assert self.cell is not None
+        axes = (Z, Y, X)[-len(self.cell):]
+
+        # Find the cell each pixel is in, and the cells around them.
+        coords = []
+        indices = []
+        cells = []
+        for axis, length in zip(axes, self.cell):
+            axis_coords = np.arange(size[axis], dtype=self._work_dtype)
+            axis_coords += loc[axis]
+            axis_cells = (axis_coords // length).astype(int)
+            first = axis_cells[0] - 1
+            coords.append(axis_coords)
+            indices.append(axis_cells - first)
+            cells.append(np.arange(first, axis_cells[-1] + 2))
+
+        # Place the points in each cell.
+        shape = [len(c) for c in cells]
+        start = [c[0] for c in cells]
+        offsets = self._counter_random(
+            (*shape, self.points, len(axes)),
+            (*start, 0, 0)
+        ).astype(self._work_dtype)
+        offsets = np.moveaxis(offsets, (-2, -1), (0, 1))
+        points = np.empty_like(offsets)
+        for i, length in enumerate(self.cell):
+            cell_coords = self._expand(cells[i], i, len(axes))
+            points[:, i] = (cell_coords + offsets[:, i]) * length
+        return coords, indices, cells, points
+
+    def _cell_distances(
+        self, coords: list[ImgAry],
+        indices: list[ImgAry],
+        points: ImgAry
+    ) -> Iterator[tuple[ImgAry, tuple[int, ...], int]]:
+        """Yield the square of the distance from each pixel to each
+        point in the cells around it, along with the neighboring cell
+        and the point within the cell it was found for.
+        """
+        ndim = len(coords)
+        shape = [len(c) for c in coords]
+        for neighbor in product((-1, 0, 1), repeat=ndim):
+            near = points
+            for i in range(ndim):
+                near = np.take(near, indices[i] + neighbor[i], i + 2)
+            for n, point in enumerate(near):
+                work = np.zeros(shape, dtype=self._work_dtype)
+                for i in range(ndim):
+                    axis_coords = self._expand(coords[i], i, ndim)
+                    work += (point[i] - axis_coords) ** 2
+                yield work, neighbor, n
+
+    def _cellular_features(
+        self, size: Size,
+        loc: Loc
+    ) -> tuple[ImgAry, ImgAry, NDArray[np.int64]]:
+        """Find the squares of the distances to the nearest and second
+        nearest points in the cells around each pixel, and a hash that
+        identifies the nearest point.
+        """
+        coords, indices, cells, points = self._cell_points(size, loc)
+        ndim = len(coords)
+
+        # Each point is identified by a hash of the location of its
+        # cell and its index within the cell.
+        shape = [len(c) for c in cells]
+        start = [c[0] for c in cells]
+        ids = self._counter_hash(
+            (*shape, self.points),
+            (*start, 0),
+            stream=1
+        ).view(np.int64)
+        ids = np.moveaxis(ids, -1, 0)
+
+        shape = [len(c) for c in coords]
+        f1 = np.full(shape, np.inf, dtype=self._work_dtype)
+        f2 = np.full(shape, np.inf, dtype=self._work_dtype)
+        index = np.zeros(shape, dtype=np.int64)
+        for work, neighbor, n in self._cell_distances(
+            coords, indices, points
+        ):
+            point_ids = ids[n]
+            for i in range(ndim):
+                point_ids = np.take(point_ids, indices[i] + neighbor[i], i)
+            self._update_features(f1, f2, index, work, point_ids)
+
+        # Cells that are the same in every frame need a Z axis.
+        features = f1, f2, index
+        if ndim < 3:
+            features = tuple(a[np.newaxis, ...] for a in features)
+        return features
+
+    def _cellular_sq(self, size: Size, loc: Loc) -> ImgAry:
+        """Find the square of the distance from each pixel to the
+        nearest point in the cells around it.
+        """
+        coords, indices, _, points = self._cell_points(size, loc)
+        shape = [len(c) for c in coords]
+        a = np.full(shape, np.inf, dtype=self._work_dtype)
+        for work, _, _ in self._cell_distances(coords, indices, points):
+            np.minimum(a, work, out=a)
+
+        # Cells that are the same in every frame need a Z axis.
+        if len(coords) < 3:
+            a = a[np.newaxis, ...]
+        return a
+
+    def _expand(self, a: ImgAry, axis: int, ndim: int) -> ImgAry:
+        """Shape a one-dimensional array to broadcast along an axis."""
+        shape = [1] * ndim
+        shape[axis] = len(a)
+        return a.reshape(shape)
+
+    def _nearest_sq(self, seeds: ImgAry, size: Size) -> ImgAry:
+        """Find the square of the distance from each pixel to the
+        nearest point. Only the points that could be the nearest to
+        a pixel in a tile are checked for the pixels in that tile.
+        """
+        a = np.empty(size, dtype=self._work_dtype)
+        for tile in tile_slices(size, self._tile):
+            lows = np.array([s.start for s in tile], dtype=seeds.dtype)
+            highs = np.array([s.stop - 1 for s in tile], dtype=seeds.dtype)
+
+            # Every pixel in the tile is at least as close to its
+            # nearest point as the farthest corner of the tile is to
+            # the point nearest that corner, so points whose nearest
+            # distance to the tile is farther than that can be skipped.
+            near = np.maximum(np.maximum(lows - seeds, seeds - highs), 0)
+            far = np.maximum(np.abs(seeds - lows), np.abs(seeds - highs))
+            near_sq = np.sum(near ** 2, axis=-1)
+            far_sq = np.sum(far ** 2, axis=-1)
+            bound = np.min(far_sq, initial=np.inf)
+            candidates = seeds[near_sq <= bound]
+
+            # Find the distances to the candidates for the tile.
+            work = np.zeros(
+                (len(candidates), *(s.stop - s.start for s in tile)),
+                dtype=self._work_dtype
+            )
+            for axis, s in enumerate(tile):
+                coords = np.arange(s.start, s.stop, dtype=self._work_dtype)
+                shape = [1] * work.ndim
+                shape[axis + 1] = len(coords)
+                axis_dist = candidates[:, axis].reshape(-1, 1, 1, 1)
+                axis_dist = axis_dist - coords.reshape(shape)
+                work += axis_dist ** 2
+            a[tile] = np.min(work, axis=0, initial=np.inf)
+        return a
+
+    def _dist_sq(self, point: Loc, indices: Sequence[ImgAry]) -> ImgAry:
+        """Find the square of the distance from each pixel to a point."""
+        axis_dist = [p - i for p, i in zip(point, indices)]
+        return sum(d ** 2 for d in axis_dist)
+
+    def _place_seeds(self, size: Size) -> ImgAry:
+        """Place the points in the overall volume of noise."""
         volume_size = self.volume
         if volume_size is None:
             volume_size = size
         volume = np.array(volume_size, dtype=float)
 
-        # Place the seeds in the overall volume of noise.
-        seeds = self._rng.random((self.points, 3), dtype=float)
-        seeds = np.around(seeds * (volume - 1)).astype(float)
-        seeds += np.array(self.origin)
+        if self.mode == 'counter':
+            seeds = self._counter_random((self.points, 3), (0, 0))
+        else:
+            seeds = self._rng.random((self.points, 3), dtype=float)
+        seeds = np.around(seeds * (volume - 1)) + np.array(self.origin)
+        return seeds.astype(self._work_dtype)
 
-        # Map the distances to the points.
-        indices = np.indices(size)
-        max_dist = np.sqrt(sum(n ** 2 for n in size))
-        dist = np.zeros(size, dtype=float)
-        dist.fill(max_dist)
-        for i in range(self.points):
-            point = seeds[i]
-            work = self._hypot(point, indices)
-            dist[work < dist] = work[work < dist]
-
-        act_max_dist = np.max(dist)
-        a = dist / act_max_dist
-        return a
+    def _tiled_features(
+        self, seeds: ImgAry,
+        size: Size
+    ) -> tuple[ImgAry, ImgAry, NDArray[np.int64]]:
+        """Find the squares of the distances to the nearest and second
+        nearest points and the index of the nearest point. Only the
+        points that could be one of the two nearest to a pixel in a
+        tile are checked for the pixels in that tile.
+        """
+        f1 = np.empty(size, dtype=self._work_dtype)
+        f2 = np.empty(size, dtype=self._work_dtype)
+        index = np.empty(size, dtype=np.int64)
+        for tile in tile_slices(size, self._tile):
+            lows = np.array([s.start for s in tile], dtype=seeds.dtype)
+            highs = np.array([s.stop - 1 for s in tile], dtype=seeds.dtype)
 
-    # Private methods.
-    def _hypot(self, point: Loc, indices: NDArray[np.int_]) -> ImgAry:
-        axis_dist = [p - i for p, i in zip(point, indices)]
-        return np.sqrt(sum(d ** 2 for d in axis_dist))
+            # Every pixel in the tile has two points at least as close
+            # as the two points nearest to the farthest corner of the
+            # tile, so this is the same bound as in _nearest_sq but
+            # using the second nearest point.
+            near = np.maximum(np.maximum(lows - seeds, seeds - highs), 0)
+            far = np.maximum(np.abs(seeds - lows), np.abs(seeds - highs))
+            near_sq = np.sum(near ** 2, axis=-1)
+            far_sq = np.sum(far ** 2, axis=-1)
+            bound = np.inf
+            if len(far_sq) > 1:
+                bound = np.partition(far_sq, 1)[1]
+            candidates = np.flatnonzero(near_sq <= bound)
+
+            tile_f1 = f1[tile]
+            tile_f1.fill(np.inf)
+            tile_f2 = f2[tile]
+            tile_f2.fill(np.inf)
+            tile_index = index[tile]
+            tile_index.fill(0)
+            indices = open_grid(
+                [s.stop - s.start for s in tile],
+                [s.start for s in tile],
+                self._work_dtype
+            )
+            for i in candidates:
+                work = self._dist_sq(seeds[i], indices)
+                self._update_features(
+                    tile_f1, tile_f2, tile_index, work, i
+                )
+        return f1, f2, index
+
+    def _update_features(
+        self, f1: ImgAry,
+        f2: ImgAry,
+        index: NDArray[np.int64],
+        work: ImgAry,
+        point_index: Union[int, NDArray[np.int64]]
+    ) -> None:
+        """Update the nearest and second nearest distances and the
+        index of the nearest point with the distances to a point.
+        Ties go to the point checked first.
+        """
+        nearer = work < f1
+        np.minimum(f2, np.where(nearer, f1, work), out=f2)
+        np.copyto(index, point_index, where=nearer)
+        np.copyto(f1, work, where=nearer)
 
 
 class OctaveWorley(Source):
@@ -151,6 +510,16 @@ class OctaveWorley(Source):
         same values. Note: strings that are passed to seed will
         be converted to UTF-8 bytes before being converted to
         integers for seeding.
+    :param dtype: (Optional.) The data type of the image data.
+    :param mode: (Optional.) How the random numbers are generated.
+        See :class:`Worley` for details.
+    :param search: (Optional.) How to find the nearest point to each
+        pixel. See :class:`Worley` for details.
+    :param cell: (Optional.) The size of the cells of the lattice
+        the points are placed in for the first octave. The size of
+        the cells shrinks each octave, so the number of points in the
+        space changes with the frequency. See :class:`Worley` for
+        details.
     :return: :class:`OctaveWorley` object.
     :rtype: imggen.worley.OctaveWorley
     """
@@ -162,7 +531,11 @@ class OctaveWorley(Source):
         points: int = 10,
         volume: Optional[Size] = None,
         origin: Loc = (0, 0, 0),
-        seed: Seed = None
+        seed: Seed = None,
+        dtype: DTypeLike = 'float64',
+        mode: Mode = 'stream',
+        search: Search = 'tiles',
+        cell: Optional[Sequence[float]] = None
     ) -> None:
         self.octaves = octaves
         self.persistence = persistence
@@ -172,24 +545,108 @@ class OctaveWorley(Source):
         self.volume = volume
         self.origin = origin
         self.seed = seed
-    
+        self.dtype = dtype
+        self.mode = mode
+        self.search = search
+        self.cell = cell
+
+    # Properties.
+    @property
+    def loc_consistent(self) -> bool:
+        """Whether tiles of this source line up with each other."""
+        return self.cell is not None
+
+    # Public methods.
     def fill(
         self, size: Sequence[int],
-        loc: Sequence[int] = (0, 0, 0)
+        loc: Sequence[int] = (0, 0, 0),
+        out: Optional[ImgAry] = None
     ) -> ImgAry:
-        a = np.zeros(tuple(size), dtype=float)
+        if self.cell is None and self.seed is not None:
+            return self._fill_incremental(size, out)
+
+        a = self._blank(size, out)
+        work = np.empty(tuple(size), dtype=self._work_dtype)
         max_value = 0.0
         for i in range(self.octaves):
             amp = self.amplitude + (self.persistence * i)
             freq = self.frequency * 2 ** i
             points = self.points * freq
+            cell = None
+            if self.cell is not None:
+                points = self.points
+                scale = freq ** (1 / len(self.cell))
+                cell = [n / scale for n in self.cell]
             octave = Worley(
                 points=points,
                 volume=self.volume,
                 origin=self.origin,
-                seed=self.seed
+                seed=self.seed,
+                dtype=self._work_dtype,
+                mode=self.mode,
+                search=self.search,
+                cell=cell
             )
-            a += octave.fill(size, loc) * amp
+            octave.fill(size, loc, work)
+            work *= amp
+            a += work
             max_value += amp
         a /= max_value
-        return a
+        return self._output(a, size, out)
+
+    # Private methods.
+    def _fill_incremental(
+        self, size: Size,
+        out: Optional[ImgAry] = None
+    ) -> ImgAry:
+        """Fill a volume with image data, keeping the distances to the
+        nearest point between octaves.
+
+        Since every octave uses the same seed, the points of each
+        octave are the points of the octave before it plus some new
+        points. That means only the distances to the new points need
+        to be found for each octave.
+        """
+        amps = [self.amplitude + (self.persistence * i)
+                for i in range(self.octaves)]
+        counts = [int(self.points * self.frequency * 2 ** i)
+                  for i in range(self.octaves)]
+        worley = Worley(
+            points=max(counts, default=0),
+            volume=self.volume,
+            origin=self.origin,
+            seed=self.seed,
+            dtype=self._work_dtype,
+            mode=self.mode,
+            search=self.search
+        )
+        seeds = worley._place_seeds(size)
+        max_dist = np.sqrt(sum(n ** 2 for n in size))
+
+        a = self._blank(size, out)
+        dist_sq = np.full(tuple(size), np.inf, dtype=self._work_dtype)
+        work = np.empty_like(dist_sq)
+        if self.search == 'brute':
+            indices = open_grid(size, dtype=self._work_dtype)
+        placed = 0
+        for amp, count in zip(amps, counts):
+            new_seeds = seeds[placed:count]
+            if self.search == 'brute':
+                for point in new_seeds:
+                    np.minimum(
+                        dist_sq, worley._dist_sq(point, indices), out=dist_sq
+                    )
+            else:
+                np.minimum(
+                    dist_sq, worley._nearest_sq(new_seeds, size), out=dist_sq
+                )
+            placed = max(placed, count)
+
+            # Each octave is scaled by its own farthest distance.
+            np.sqrt(dist_sq, out=work)
+            np.minimum(work, work.dtype.type(max_dist), out=work)
+            work /= np.max(work)
+            work *= amp
+            a += work
+        a /= sum(amps)
+        return self._output(a, size, out)
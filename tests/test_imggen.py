@@ -4,6 +4,7 @@ test_imggen
 
 Unit tests for the imggen.imggen module.
 """
+import numpy as np
 import pytest as pt
 
 from imggen import imggen as r
@@ -61,3 +62,145 @@ def test_Serializable_repr(serial):
     assert repr(serial) == "Serial(spam='0123...9', eggs=2)"
     serial.spam = b'3'
     assert repr(serial) == "Serial(spam=b'3', eggs=2)"
+
+
+# Fixtures for Source.
+@pt.fixture
+def source():
+    """An object of a :class:`Source` class."""
+    class Ramp(r.Source):
+        loc_consistent = True
+
+        def __init__(self, step):
+            self.step = step
+
+        def fill(self, size, loc=(0, 0, 0), out=None):
+            a = np.indices(size, dtype=float)
+            for axis in range(len(size)):
+                a[axis] += loc[axis]
+            return self._output(sum(a) * self.step, size, out)
+
+    return Ramp(0.01)
+
+
+# Tests for Source.
+def test_Source_fill_tiled(source):
+    """The :meth:`Source.fill_tiled` method should return the same image
+    data as :meth:`Source.fill` for sources that are consistent at
+    any location.
+    """
+    size = (3, 7, 5)
+    loc = (1, 2, 3)
+    assert (source.fill_tiled(size, (2, 3, 2), loc) == source.fill(
+        size, loc
+    )).all()
+
+
+def test_Source_fill_tiled_out(source):
+    """When given an array, :meth:`Source.fill_tiled` should put the
+    image data into that array.
+    """
+    out = np.zeros((2, 4, 4))
+    result = source.fill_tiled((2, 4, 4), (1, 2, 2), out=out)
+    assert result is out
+    assert (out == source.fill((2, 4, 4))).all()
+
+
+def test_Source_iter_tiles(source):
+    """The :meth:`Source.iter_tiles` method should yield the slices
+    for each tile and the image data for that tile.
+    """
+    result = list(source.iter_tiles((1, 3, 2), (1, 2, 2), (0, 1, 0)))
+    assert len(result) == 2
+    assert result[1][0] == (slice(0, 1), slice(2, 3), slice(0, 2))
+    assert (result[1][1] == source.fill((1, 1, 2), (0, 3, 0))).all()
+
+
+# Tests for tile_slices.
+def test_tile_slices_bad_tile():
+    """If the tile doesn't have a positive length on every axis,
+    :func:`tile_slices` should raise a ValueError.
+    """
+    with pt.raises(ValueError):
+        list(r.tile_slices((1, 4, 4), (1, 0, 2)))
+    with pt.raises(ValueError):
+        list(r.tile_slices((1, 4, 4), (2, 2)))
+
+
+def test_Source_output_broadcast(source):
+    """The :meth:`Source._output` method should broadcast image data
+    that doesn't vary along an axis to fill the volume.
+    """
+    a = np.array([[[0.25, 0.5]]])
+    out = np.zeros((2, 3, 2))
+    result = source._output(a, (2, 3, 2), out)
+    assert result is out
+    assert (out[:, :, 0] == 0.25).all()
+    assert (out[:, :, 1] == 0.5).all()
+
+
+def test_Source_output_bad_shape(source):
+    """If the output array isn't the size of the volume,
+    :meth:`Source._output` should raise a ValueError.
+    """
+    with pt.raises(ValueError):
+        source._output(np.zeros((1, 2, 2)), (1, 2, 2), np.zeros((1, 3, 2)))
+
+
+def test_Source_output_dtype(source):
+    """The :meth:`Source._output` method should convert the image data
+    to the data type of the source, scaling it to fill the range of
+    integer types.
+    """
+    a = np.array([[[0.0, 0.5, 1.0, 1.5]]])
+    source.dtype = 'uint8'
+    result = source._output(a, (1, 1, 4))
+    assert result.dtype == np.uint8
+    assert result.tolist() == [[[0x00, 0x7f, 0xff, 0xff]]]
+    source.dtype = 'float32'
+    assert source._output(a, (1, 1, 4)).dtype == np.float32
+
+
+def test_Source_repeat(source):
+    """The :meth:`Source._repeat` method should repeat the image data
+    for a period to fill the volume.
+    """
+    a = np.array([[[0.0, 0.5, 1.0]]])
+    assert source.period is None
+    result = source._repeat(a, (2, 1, 7))
+    assert result.tolist() == [
+        [[0.0, 0.5, 1.0, 0.0, 0.5, 1.0, 0.0]],
+        [[0.0, 0.5, 1.0, 0.0, 0.5, 1.0, 0.0]],
+    ]
+
+
+def test_Source_output_broadcast_view(source):
+    """When the source has broadcast set and no output array is given,
+    :meth:`Source._output` should return a read-only view that repeats
+    the image data along the axes it doesn't vary along.
+    """
+    a = np.array([[[0.0, 0.5, 1.0]]])
+    source.broadcast = True
+    source.dtype = 'uint8'
+    result = source._output(a, (2, 3, 3))
+    assert result.shape == (2, 3, 3)
+    assert not result.flags.writeable
+    assert r.is_invariant(result, 0)
+    assert r.is_invariant(result, 1)
+    assert not r.is_invariant(result, 2)
+    assert result.tolist() == [[[0x00, 0x7f, 0xff]] * 3] * 2
+
+
+# Tests for open_grid.
+def test_open_grid():
+    """The :func:`open_grid` function should return the location of
+    each pixel along each axis as arrays that broadcast to the same
+    locations as :func:`numpy.indices`.
+    """
+    size = (2, 3, 4)
+    loc = (1, -2, 5)
+    grid = r.open_grid(size, loc, 'float32')
+    assert [a.shape for a in grid] == [(2, 1, 1), (1, 3, 1), (1, 1, 4)]
+    assert all(a.dtype == np.float32 for a in grid)
+    expected = np.indices(size) + np.array(loc).reshape(3, 1, 1, 1)
+    assert (np.stack(np.broadcast_arrays(*grid)) == expected).all()
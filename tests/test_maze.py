@@ -170,6 +170,68 @@ class TestMaze:
             ],
         ], dtype=np.uint8)).all()
 
+    def test_fill_broadcast(self):
+        """When broadcast is set, :meth:`Maze.fill` should return a
+        read-only view that repeats the same path in every frame.
+        """
+        kwargs = {
+            'width': 0.34,
+            'inset': (0, 0, 0),
+            'unit': (1, 3, 3),
+            'seed': 'spam',
+        }
+        maze = m.Maze(**kwargs, broadcast=True)
+        result = maze.fill((3, 9, 9))
+        assert not result.flags.writeable
+        assert result.strides[0] == 0
+        assert (result == m.Maze(**kwargs).fill((3, 9, 9))).all()
+
+    def test_fill_origin_outside_grid(self):
+        """Given an origin outside of the grid, :meth:`Maze.fill`
+        should raise an IndexError.
+        """
+        maze = m.Maze(unit=(1, 3, 3), origin=(0, 5, 0), seed='spam')
+        with pt.raises(IndexError):
+            maze.fill((1, 9, 9))
+
+    def test_fill_path_reaches_every_vertex(self):
+        """The path built by :class:`Maze` should reach every vertex
+        of the grid exactly once.
+        """
+        maze = m.Maze(unit=(1, 1, 1), inset=(0, 0, 0), seed='spam')
+        values, unit_dim = maze._build_grid((1, 12, 16), (0, 0, 0))
+        path = maze._build_path(values, unit_dim).steps()
+        ends = [step[1] for step in path]
+        assert len(path) == unit_dim[1] * unit_dim[2] - 1
+        assert len(set(ends)) == len(ends)
+        assert (0, 0, 0) not in ends
+
+    def test_fill_cache_dir(self, tmp_path):
+        """Given a cache directory, :meth:`Maze.fill` should save the
+        path through the maze there and use it for later mazes with
+        the same path, even if they are drawn differently.
+        """
+        kwargs = {'unit': (1, 3, 3), 'seed': 'spam'}
+        maze = m.Maze(**kwargs, cache_dir=tmp_path)
+        maze.fill((1, 9, 9))
+        assert len(list(tmp_path.glob('*.npz'))) == 1
+
+        m.clear_topology_cache()
+        maze = m.Maze(**kwargs, width=0.34, cache_dir=tmp_path)
+        result = maze.fill((1, 9, 9))
+        assert len(m._topologies) == 1
+        assert (result == m.Maze(**kwargs, width=0.34).fill((1, 9, 9))).all()
+
+    def test_fill_cached_topology(self):
+        """Mazes that only differ in how they are drawn should share
+        the same cached path.
+        """
+        m.clear_topology_cache()
+        m.Maze(unit=(1, 3, 3), seed='spam').fill((1, 9, 9))
+        m.Maze(unit=(1, 6, 6), width=0.5, seed='spam').fill((1, 18, 18))
+        m.SolvedMaze(unit=(1, 3, 3), seed='spam').fill((1, 9, 9))
+        assert len(m._topologies) == 1
+
 
 class TestAnimatedMaze:
     # Tests for initiation.
@@ -434,6 +496,22 @@ class TestAnimatedMaze:
             ],
         ], dtype=np.uint8)).all()
 
+    def test_fill_tiled(self):
+        """Since :class:`AnimatedMaze` adds frames to the volume, it
+        cannot be filled in tiles.
+        """
+        maze = m.AnimatedMaze(unit=(1, 3, 3), seed='spam')
+        with pt.raises(ValueError):
+            maze.fill_tiled((2, 9, 9), (1, 9, 9))
+
+    def test_iter_tiles(self):
+        """Since :class:`AnimatedMaze` adds frames to the volume, it
+        cannot be iterated in tiles.
+        """
+        maze = m.AnimatedMaze(unit=(1, 3, 3), seed='spam')
+        with pt.raises(ValueError):
+            next(maze.iter_tiles((2, 9, 9), (1, 9, 9)))
+
 
 class TestSolvedMaze:
     # Tests for initiation.
@@ -547,3 +625,42 @@ class TestSolvedMaze:
                 [0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00],
             ],
         ], dtype=np.uint8)).all()
+
+    def test_fill_tree(self):
+        """When the algorithm is tree, :meth:`SolvedMaze.fill` should
+        find the same solution as the other algorithms.
+        """
+        kwargs = {
+            'start': 'bl',
+            'end': 'tr',
+            'width': 0.34,
+            'unit': (1, 3, 3),
+            'seed': 'spam',
+        }
+        maze = m.SolvedMaze(**kwargs, algorithm='tree')
+        result = maze.fill((1, 15, 15))
+        for algorithm in 'branches', 'breadcrumb':
+            expected = m.SolvedMaze(**kwargs, algorithm=algorithm)
+            assert (result == expected.fill((1, 15, 15))).all()
+
+    def test_fill_tree_no_solution(self):
+        """When the algorithm is tree and the start is outside of the
+        maze, :meth:`SolvedMaze.fill` should raise a ValueError.
+        """
+        maze = m.SolvedMaze(
+            start=(0, 9, 9), unit=(1, 3, 3), seed='spam', algorithm='tree'
+        )
+        with pt.raises(ValueError):
+            maze.fill((1, 9, 9))
+
+    def test_fill_start_is_end(self):
+        """When the start and the end are the same location, every
+        algorithm should find a solution with no steps.
+        """
+        for algorithm in 'branches', 'breadcrumb', 'tree':
+            maze = m.SolvedMaze(
+                start='mm', end='mm', unit=(1, 3, 3), seed='spam',
+                algorithm=algorithm
+            )
+            result = maze.fill((1, 9, 9))
+            assert (result == 0).all()
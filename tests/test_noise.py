@@ -5,6 +5,7 @@ test_noise
 Unit tests for the imggen.noise module.
 """
 import numpy as np
+import pytest as pt
 
 from imggen import noise as n
 
@@ -92,6 +93,43 @@ class TestNoise:
         shape = (2, 8, 8)
         assert not (a.fill(shape) == b.fill(shape)).all()
 
+    def test_fill_counter_repeats(self):
+        """In "counter" mode, :meth:`Noise.fill` should return the same
+        noise each time the same location is filled.
+        """
+        noise = n.Noise('spam', mode='counter')
+        shape = (2, 8, 8)
+        loc = (1, 40000, -3)
+        assert (noise.fill(shape, loc) == noise.fill(shape, loc)).all()
+
+    def test_fill_counter_tiled(self):
+        """In "counter" mode, tiles of :class:`Noise` should line up
+        with each other.
+        """
+        noise = n.Noise('spam', mode='counter')
+        size = (2, 9, 10)
+        loc = (0, 5, -7)
+        assert noise.loc_consistent
+        assert (noise.fill_tiled(size, (1, 4, 3), loc) == noise.fill(
+            size, loc
+        )).all()
+
+    def test_fill_out_wrong_shape(self):
+        """Given an output array that isn't the size of the volume,
+        :meth:`Noise.fill` should raise a ValueError, even when it
+        could write straight into the array.
+        """
+        noise = n.Noise('spam')
+        with pt.raises(ValueError):
+            noise.fill((1, 2, 2), out=np.zeros((1, 2, 3)))
+
+    def test_init_bad_mode(self):
+        """Given a mode that doesn't exist, :class:`Noise` should raise
+        a ValueError.
+        """
+        with pt.raises(ValueError):
+            n.Noise('spam', mode='spam')
+
 
 class TestEmbers:
     # Test for initialization.
@@ -150,3 +188,46 @@ class TestEmbers:
                 [0xc1, 0xcc, 0xcb, 0x00, 0xd2, 0x00, 0xbf, 0x00],
             ],
         ], dtype=np.uint8)).all()
+
+    def test_fill_sparse(self):
+        """When sparse, :meth:`Embers.fill` should return points with
+        the same distribution as the dense points.
+        """
+        size = (2, 200, 200)
+        dense = n.Embers(threshhold=0.9, seed='bacon').fill(size)
+        sparse = n.Embers(threshhold=0.9, seed='bacon', sparse=True)
+        result = sparse.fill(size)
+        assert abs((result > 0).mean() - (dense > 0).mean()) < 0.005
+        assert result.max() <= 0.775
+        assert result[result > 0].min() >= 0.75
+        assert abs(result[result > 0].mean() - 0.7625) < 0.001
+
+    def test_fill_counter_tiled(self):
+        """In "counter" mode with a depth of one, tiles of
+        :class:`Embers` should line up with each other. Deeper
+        embers aren't consistent across tiles.
+        """
+        noise = n.Embers(threshhold=0.9, seed='spam', mode='counter')
+        size = (2, 9, 10)
+        loc = (0, 5, -7)
+        assert noise.loc_consistent
+        assert (noise.fill_tiled(size, (1, 4, 3), loc) == noise.fill(
+            size, loc
+        )).all()
+        deeper = n.Embers(depth=2, seed='spam', mode='counter')
+        assert not deeper.loc_consistent
+
+    def test__upscale(self):
+        """The :meth:`Embers._upscale` method should resize every frame
+        of the image data using bilinear interpolation.
+        """
+        embers = n.Embers(seed='bacon')
+        a = np.array([[[0, 1], [1, 1]], [[1, 1], [1, 1]]], dtype=float)
+        result = embers._upscale(a, (2, 4, 4))
+        assert (result[0] == np.array([
+            [0.0, 0.25, 0.75, 1.0],
+            [0.25, 0.4375, 0.8125, 1.0],
+            [0.75, 0.8125, 0.9375, 1.0],
+            [1.0, 1.0, 1.0, 1.0],
+        ])).all()
+        assert (result[1] == 1.0).all()
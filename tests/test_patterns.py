@@ -5,6 +5,7 @@ test_patterns
 Unit tests for the imggen.patterns module.
 """
 import numpy as np
+import pytest as pt
 
 from imggen import patterns as p
 from tests.common import mkhex
@@ -136,6 +137,18 @@ class TestGradient:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_bands(self):
+        """Given stops that share a position, :meth:`Gradient.fill`
+        should use the color of the last pair of stops a pixel is
+        between, making hard edges between bands of color.
+        """
+        obj = p.Gradient(stops=[0, 0, .5, 0, .5, 1, 1, 1])
+        result = obj.fill((1, 1, 5))
+        assert result.tolist() == [[[0.0, 0.0, 1.0, 1.0, 1.0]]]
+        result[0, 0, 0] = 0.5
+        assert obj.fill((1, 1, 5)).tolist() == [[[0.0, 0.0, 1.0, 1.0, 1.0]]]
+        assert p.gradient_lut.cache_info().hits >= 1
+
 
 class TestHexes:
     # Tests for initialization.
@@ -196,6 +209,23 @@ class TestHexes:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_nearest_center(self):
+        """The image data from :meth:`Hexes.fill` should be based on
+        the distance from each pixel to the nearest center in the
+        lattice of hexagons.
+        """
+        obj = p.Hexes(radius=7)
+        size = (1, 30, 40)
+        rows, columns = obj._place_centers(size)
+        indices = np.indices(size[1:])
+        dist = np.full(size[1:], np.inf)
+        for i, y in enumerate(rows):
+            for x in columns[i % 2]:
+                work = np.sqrt((y - indices[0]) ** 2 + (x - indices[1]) ** 2)
+                dist = np.minimum(dist, work)
+        expected = 1 - dist / np.max(dist)
+        assert (obj.fill(size) == expected).all()
+
 
 class TestLines:
     # Tests for initialization.
@@ -247,6 +277,19 @@ class TestLines:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_period(self):
+        """When the distance between the lines is a whole number of
+        pixels, :meth:`Lines.fill` should repeat the image data every
+        period.
+        """
+        obj = p.Lines(direction='v', length=6)
+        assert obj.period == (5, 1, 5)
+        size = (3, 4, 17)
+        loc = (2, -3, 9)
+        result = obj.fill(size, loc)
+        assert (result == obj.fill(size, (7, 40, 4))).all()
+        assert (result[..., :12] == result[..., 5:]).all()
+
 
 class TestRays:
     # Tests for initialization.
@@ -367,6 +410,16 @@ class TestRing:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_overlapping(self):
+        """When rings overlap, :meth:`Rings.fill` should draw the
+        later rings on top of the earlier rings.
+        """
+        obj = p.Rings(radius=2, width=4, gap=2, count=2)
+        result = obj.fill((1, 1, 9))
+        assert (result == np.array([[
+            [1.0, 0.5, 0.0, 0.5, 0.0, 0.5, 0.0, 0.5, 1.0],
+        ]])).all()
+
 
 class TestSolid:
     # Tests for initialization.
@@ -406,6 +459,28 @@ class TestSolid:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_out(self):
+        """Given an array, :meth:`Solid.fill` should put the image data
+        into that array. This includes views into larger arrays.
+        """
+        canvas = np.zeros((2, 8, 8))
+        obj = p.Solid(color=0.5)
+        result = obj.fill((2, 4, 4), out=canvas[:, 2:6, 2:6])
+        assert result.base is canvas
+        assert canvas.sum() == 16
+        assert (canvas[:, 2:6, 2:6] == 0.5).all()
+
+    def test_fill_broadcast(self):
+        """When broadcast is set, :meth:`Solid.fill` should return a
+        read-only view of the color.
+        """
+        obj = p.Solid(color=0.5, broadcast=True)
+        result = obj.fill((2, 4, 4))
+        assert obj.invariant_axes == (0, 1, 2)
+        assert not result.flags.writeable
+        assert result.base.size == 1
+        assert (result == 0.5).all()
+
 
 class TestSpheres:
     # Tests for initialization.
@@ -488,6 +563,22 @@ class TestSpheres:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_period(self):
+        """When the diameter of the spheres is a whole number of pixels,
+        :meth:`Spheres.fill` should generate the same image data as it
+        does for one period repeated to fill the volume.
+        """
+        obj = p.Spheres(radius=2.5, offset='x')
+        assert obj.period == (5, 10, 5)
+        size = (2, 23, 12)
+        loc = (3, -4, 7)
+        result = obj.fill(size, loc)
+        assert (result == obj.fill(size, (8, 6, 2))).all()
+        for y, x in (0, 0), (13, 0), (0, 7), (13, 7):
+            expected = obj.fill((2, 10, 5), (3, y - 4, x + 7))
+            assert (result[:, y:y + 10, x:x + 5] == expected).all()
+        assert p.Spheres(radius=2.2).period is None
+
 
 class TestSpot:
     # Tests for initialization.
@@ -514,13 +605,23 @@ class TestSpot:
         required = {
             'radius': 2.0,
         }
-        optional = {}
+        optional = {
+            'dtype': 'float32',
+        }
         obj = p.Spot(**required, **optional)
         for attr in required:
             assert getattr(obj, attr) == required[attr]
         for attr in optional:
             assert getattr(obj, attr) == optional[attr]
 
+    def test_init_extra_positional(self):
+        """Given extra positional parameters, :class:`Spot` should
+        ignore them rather than reading them as the data type.
+        """
+        obj = p.Spot(6, 'io')
+        assert obj.radius == 6.0
+        assert obj.dtype == 'float64'
+
     # Tests for fill.
     def test_fill(self):
         """Given the shape of an output array, :meth:`Spot.fill`
@@ -564,6 +665,65 @@ class TestText:
             ],
         ], dtype=np.uint8)).any()
 
+    def test_fill_frames(self):
+        """Given a start and duration, :meth:`Text.fill` should draw
+        the same text in each frame within that window and leave the
+        other frames blank.
+        """
+        obj = p.Text(text='s', size=6, origin=(3, 0), start=1, duration=2)
+        result = obj.fill((4, 8, 8))
+        assert not result[0].any()
+        assert result[1].any()
+        assert (result[1] == result[2]).all()
+        assert not result[3].any()
+
+    def test_fill_sequence(self):
+        """Given a sequence of strings, :meth:`Text.fill` should
+        draw the next string in each frame and leave the frames
+        after the sequence runs out blank.
+        """
+        obj = p.Text(text=['s', 't'], size=6, origin=(3, 0))
+        result = obj.fill((3, 8, 8))
+        assert (result[0] == p.Text('s', size=6, origin=(3, 0)).fill(
+            (1, 8, 8)
+        )[0]).all()
+        assert (result[1] == p.Text('t', size=6, origin=(3, 0)).fill(
+            (1, 8, 8)
+        )[0]).all()
+        assert not result[2].any()
+
+    def test_fill_atlas(self):
+        """When atlas is `True`, :meth:`Text.fill` should build the
+        text from the glyphs of the font rather than drawing it.
+        """
+        kwargs = {'text': ['s', 't'], 'size': 6, 'origin': (1, 0)}
+        obj = p.Text(**kwargs, atlas=True)
+        result = obj.fill((2, 8, 10))
+        assert (result == p.Text(**kwargs).fill((2, 8, 10))).all()
+
+    def test_fill_atlas_lines(self):
+        """When atlas is `True`, :meth:`Text.fill` should space and
+        align lines the same way they are drawn. Glyphs that overlap
+        can blend slightly differently.
+        """
+        for align in 'left', 'center', 'right':
+            kwargs = {
+                'text': 'ab\nabcd\nabc',
+                'size': 14,
+                'origin': (1.5, 0.7),
+                'align': align,
+            }
+            result = p.Text(**kwargs, atlas=True).fill((1, 50, 60))
+            expected = p.Text(**kwargs).fill((1, 50, 60))
+            assert (abs(result - expected) <= 0x08 / 0xff).all()
+
+    def test_init_atlas_stroke(self):
+        """Given a stroke width and atlas, :class:`Text` should raise
+        a ValueError.
+        """
+        with pt.raises(ValueError):
+            p.Text(text='s', stroke_width=1, atlas=True)
+
 
 class TestWaves:
     # Tests for initialization.
@@ -621,3 +781,53 @@ class TestWaves:
                 [0x4c, 0x21, 0x75, 0xa3, 0xa3, 0x75, 0x21, 0x4c],
             ],
         ], dtype=np.uint8)).any()
+
+    def test_fill_geometric(self):
+        """Given geometric growth, :meth:`Waves.fill` should return
+        waves that are each twice as long as the wave inside them.
+        """
+        obj = p.Waves(length=2, growth='g')
+        result = obj.fill((1, 1, 17))
+        assert (result == np.array([[
+            [
+                1.0, 0.5, 0.0, 0.5, 1.0, 0.0, 1.0, 0.0, 1.0,
+                0.0, 1.0, 0.0, 1.0, 0.5, 0.0, 0.5, 1.0,
+            ],
+        ]])).all()
+
+
+class TestFields:
+    # Tests for the coordinate fields.
+    def test_angle_field(self):
+        """The :func:`angle_field` function should return the angle of
+        each pixel from the center, from zero to two pi, as a read-only
+        array.
+        """
+        result = p.angle_field((3, 3), (1.0, 1.0))
+        assert not result.flags.writeable
+        assert np.allclose(result, np.array([
+            [5 * np.pi / 4, 2 * np.pi, 7 * np.pi / 4],
+            [np.pi, 0, 0],
+            [3 * np.pi / 4, 0, np.pi / 4],
+        ]))
+
+    def test_gradient_lut(self):
+        """The :func:`gradient_lut` function should return the color of
+        each pixel along the axis of a gradient as a read-only array.
+        """
+        result = p.gradient_lut(((0, 0.0), (0.5, 1.0), (1, 0.5)), 5)
+        assert not result.flags.writeable
+        assert result.tolist() == [0.0, 0.5, 1.0, 0.75, 0.5]
+
+    def test_radius_field_cache(self):
+        """The :func:`radius_field` function should return the distance
+        of each pixel from the center, and it should return the cached
+        field when called again with the same arguments.
+        """
+        p.radius_field.cache_clear()
+        result = p.radius_field((2, 3), (0.0, 1.0), 'float32')
+        assert result.dtype == np.float32
+        assert np.allclose(result, [[1, 0, 1], [np.sqrt(2), 1, np.sqrt(2)]])
+        assert p.radius_field((2, 3), (0.0, 1.0), 'float32') is result
+        assert p.radius_field.cache_info().hits == 1
+        assert p.radius_field.cache_info().misses == 1
@@ -114,3 +114,41 @@ def test_Perlin_fill():
             [0x62, 0x76, 0x8a, 0x89, 0x7c, 0x73, 0x84, 0xaa, 0xc2, 0xc7],
         ],
     ], dtype=np.uint8)).all()
+
+
+def test_Perlin_fill_tiled():
+    """When filled in tiles, :class:`Perlin` should return the same
+    image data as when filled all at once.
+    """
+    perlin = p.Perlin(unit=(2, 4, 4), seed='spam')
+    size = (3, 10, 9)
+    loc = (2, 5, 7)
+    assert perlin.loc_consistent
+    assert (perlin.fill_tiled(size, (2, 4, 4), loc) == perlin.fill(
+        size, loc
+    )).all()
+
+
+def test_Perlin_fill_out():
+    """Given an array, :meth:`Perlin.fill` should put the image data
+    into that array.
+    """
+    perlin = p.Perlin(unit=(2, 4, 4), seed='spam')
+    out = np.ones((2, 6, 6))
+    result = perlin.fill((2, 6, 6), out=out)
+    assert result is out
+    assert (out == perlin.fill((2, 6, 6))).all()
+
+
+def test_Perlin_fill_dtype():
+    """When given a data type, :class:`Perlin` should return image
+    data of that type.
+    """
+    size = (2, 6, 6)
+    expected = p.Perlin(unit=(2, 4, 4), seed='spam').fill(size)
+    perlin = p.Perlin(unit=(2, 4, 4), seed='spam', dtype='float32')
+    result = perlin.fill(size)
+    assert result.dtype == np.float32
+    assert np.allclose(result, expected, atol=1e-6)
+    perlin = p.Perlin(unit=(2, 4, 4), seed='spam', dtype='uint8')
+    assert perlin.fill(size).dtype == np.uint8
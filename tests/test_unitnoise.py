@@ -100,6 +100,25 @@ class TestUnitNoise:
             ],
         ], dtype=np.uint8)).all()
 
+    def test__map_unit_axes(self):
+        """Given the size and location of the image data,
+        :meth:`UnitNoise._map_unit_axes` should return the vertex
+        before each pixel along each axis and how far the pixel is
+        from that vertex, wrapping at 255 units.
+        """
+        noise = un.UnitNoise((2, 2, 4), seed='spam')
+        wholes, parts = noise._map_unit_axes((2, 3, 4), (0, 509, 1))
+        assert [a.tolist() for a in wholes] == [
+            [0, 0],
+            [254, 0, 0],
+            [0, 0, 0, 1],
+        ]
+        assert [a.tolist() for a in parts] == [
+            [0.0, 0.5],
+            [0.5, 0.0, 0.5],
+            [0.25, 0.5, 0.75, 0.0],
+        ]
+
 
 # Tests for CosineCurtains.
 def test_CosineCurtain_fill():
@@ -435,6 +454,25 @@ class TestOctaveUnitNoise:
             ],
         ], dtype=np.uint8)).all()
 
+    def test_fill_workers(self):
+        """When given more than one worker, :meth:`OctaveUnitNoise.fill`
+        should return the same image data as with one worker.
+        """
+        size = (3, 8, 8)
+        noise = un.OctaveUnitNoise(unit=(4, 4, 4), seed='spam')
+        expected = noise.fill(size)
+        noise = un.OctaveUnitNoise(unit=(4, 4, 4), seed='spam', workers=3)
+        assert (noise.fill(size) == expected).all()
+
+    def test__build_octaves_shared_table(self):
+        """When seeded, the octaves created by
+        :meth:`OctaveUnitNoise._build_octaves` should share a table.
+        """
+        noise = un.OctaveUnitNoise(unit=(4, 4, 4), seed='spam')
+        octaves = noise._build_octaves()
+        assert all(o._table is octaves[0]._table for o in octaves)
+        assert [o.unit for o in octaves][:2] == [[2, 2, 2], [1, 1, 1]]
+
 
 # Tests for octave_noise_factory.
 class TestOctaveNoiseFactory:
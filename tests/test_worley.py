@@ -104,6 +104,76 @@ class TestWorley:
             ],
         ], dtype=np.uint8)).all()
 
+    def test_fill_search_brute(self):
+        """The "tiles" and "brute" searches of :meth:`Worley.fill`
+        should return the same image data.
+        """
+        size = (3, 40, 70)
+        kwargs = {
+            'points': 30,
+            'volume': (5, 50, 50),
+            'origin': (-1, 5, 30),
+            'seed': 'spam',
+        }
+        tiles = w.Worley(**kwargs)
+        brute = w.Worley(**kwargs, search='brute')
+        assert (tiles.fill(size) == brute.fill(size)).all()
+
+    def test_fill_cell_tiled(self):
+        """When given a cell size, tiles of :class:`Worley` should line
+        up with each other.
+        """
+        obj = w.Worley(points=2, seed='spam', cell=(4, 8, 8))
+        size = (5, 20, 30)
+        loc = (2, -7, 11)
+        assert obj.loc_consistent
+        assert (obj.fill_tiled(size, (2, 7, 9), loc) == obj.fill(
+            size, loc
+        )).all()
+
+    def test_fill_cell_2d(self):
+        """When given a two-dimensional cell size, :meth:`Worley.fill`
+        should return the same image data in every frame.
+        """
+        obj = w.Worley(points=1, seed='spam', cell=(8, 8))
+        result = obj.fill((3, 16, 16), (5, 0, 0))
+        assert (result[0] == result[2]).all()
+        assert 0 <= result.min() and result.max() <= 1
+
+    def test_fill_features(self):
+        """:meth:`Worley.fill_features` should return the distances to
+        the nearest and second nearest points and the index of the
+        nearest point. The searches should return the same features,
+        and the nearest distances should match :meth:`Worley.fill`.
+        """
+        size = (3, 40, 70)
+        kwargs = {
+            'points': 30,
+            'volume': (5, 50, 50),
+            'origin': (-1, 5, 30),
+            'seed': 'spam',
+        }
+        tiles = w.Worley(**kwargs).fill_features(size)
+        brute = w.Worley(**kwargs, search='brute').fill_features(size)
+        for result, expected in zip(tiles, brute):
+            assert (result == expected).all()
+        assert (tiles.f1 <= tiles.f2).all()
+        assert tiles.index.min() >= 0 and tiles.index.max() < 30
+        filled = w.Worley(**kwargs).fill(size)
+        assert (tiles.f1 / np.max(tiles.f1) == filled).all()
+
+    def test_fill_features_cell(self):
+        """When given a cell size, :meth:`Worley.fill_features` should
+        return the same features for a part of a volume as for the
+        whole volume.
+        """
+        obj = w.Worley(points=2, seed='spam', cell=(4, 8, 8))
+        whole = obj.fill_features((5, 20, 30), (2, -7, 11))
+        part = obj.fill_features((2, 10, 10), (4, 0, 21))
+        for result, expected in zip(part, whole):
+            assert (result == expected[2:4, 7:17, 10:20]).all()
+        assert (whole.f1 <= whole.f2).all()
+
 
 class TestOctaveWorley:
     # Tests for Worley initialization.
@@ -171,3 +241,19 @@ class TestOctaveWorley:
                 [0xa0, 0xd9, 0xae, 0x22, 0x0b, 0x18, 0x99, 0x12],
             ],
         ], dtype=np.uint8)).all()
+
+    def test_fill_matches_octaves(self):
+        """:meth:`OctaveWorley.fill` should return the same image data
+        as adding together a :class:`Worley` for each octave.
+        """
+        size = (2, 20, 30)
+        obj = w.OctaveWorley(
+            octaves=3, persistence=2, amplitude=3, frequency=2,
+            points=4, seed='spam', search='brute'
+        )
+        expected = np.zeros(size)
+        for i in range(3):
+            octave = w.Worley(points=4 * 2 * 2 ** i, seed='spam')
+            expected += octave.fill(size) * (3 + 2 * i)
+        expected /= 3 + 5 + 7
+        assert np.allclose(obj.fill(size), expected)